@@ -3,12 +3,15 @@ from tkinter import filedialog, messagebox, ttk
 import customtkinter as ctk
 import os
 import shutil
-import csv
 from database_manager import DatabaseManager
 from face_encoder import generate_encodings
-from attendance_system import AttendanceSystem
+from attendance_system import AttendanceSystem, load_camera_configs, run_cameras
+from embedding_store import EMBEDDINGS_FILE, ensure_store
+from report_exporter import export_chunks
+from report_index import ReportIndex
 import threading
-from datetime import datetime
+import queue
+from datetime import datetime, timedelta
 from tkcalendar import DateEntry
 
 # (AddStudentWindow remains the same)
@@ -62,7 +65,7 @@ class AddStudentWindow(ctk.CTkToplevel):
         success = self.master.db_manager.add_student(student_id, name, major, year_int, section, new_image_path)
         if success:
             messagebox.showinfo("Success", f"Student {name} added.", parent=self)
-            self.master.refresh_student_list()
+            self.master.roster.student_added()
             self.destroy()
         else:
             messagebox.showerror("Error", f"Student ID '{student_id}' may already exist.", parent=self)
@@ -123,11 +126,179 @@ class EditStudentWindow(ctk.CTkToplevel):
         success = self.master.db_manager.update_student(original_id, new_details)
         if success:
             messagebox.showinfo("Success", "Student details updated.", parent=self)
-            self.master.refresh_student_list()
+            self.master.roster.student_updated(original_id, new_details)
             self.destroy()
         else:
             messagebox.showerror("Error", "Failed to update student. ID may conflict with an existing student.", parent=self)
 
+class RosterView(ctk.CTkFrame):
+    """
+    Paged student roster. A fixed pool of row widgets is created once and refilled for each
+    page; pages come from DatabaseManager.get_students_page (keyset pagination). An edit or
+    delete changes only the affected row instead of rebuilding the list; an add re-reads the page.
+    """
+    PAGE_SIZE = 50
+
+    def __init__(self, master, app, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.app = app
+        self.rows_frame = ctk.CTkScrollableFrame(self)
+        self.rows_frame.pack(fill="both", expand=True)
+        nav = ctk.CTkFrame(self, fg_color="transparent"); nav.pack(fill="x", pady=(10, 0))
+        self.prev_btn = ctk.CTkButton(nav, text="< Prev", width=80, command=self.prev_page)
+        self.prev_btn.pack(side="left")
+        self.next_btn = ctk.CTkButton(nav, text="Next >", width=80, command=self.next_page)
+        self.next_btn.pack(side="right")
+        self.page_label = ctk.CTkLabel(nav, text="")
+        self.page_label.pack(side="left", expand=True)
+        self.empty_label = ctk.CTkLabel(self.rows_frame, text="No students found.")
+        self.row_widgets = [] # (card, label) per row slot, reused across pages
+        self.students, self.first_index, self.total, self.loaded = [], 0, 0, False
+
+    @staticmethod
+    def key(student):
+        return (student['name'], student['student_id'])
+
+    def _row_widget(self, slot):
+        while len(self.row_widgets) <= slot:
+            index = len(self.row_widgets)
+            card = ctk.CTkFrame(self.rows_frame)
+            card.grid_columnconfigure(0, weight=1)
+            label = ctk.CTkLabel(card, text="", anchor="w")
+            label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+            ctk.CTkButton(card, text="Edit", width=60, command=lambda i=index: self.app.open_edit_student_window(self.students[i])).grid(row=0, column=1, padx=5, pady=5)
+            ctk.CTkButton(card, text="Delete", width=60, fg_color="#D2691E", hover_color="#8B4513",
+                          command=lambda i=index: self.app.delete_student(self.students[i]['student_id'])).grid(row=0, column=2, padx=(0, 10), pady=5)
+            self.row_widgets.append((card, label))
+        return self.row_widgets[slot]
+
+    def _set_row(self, slot):
+        student = self.students[slot]
+        self._row_widget(slot)[1].configure(text=f"ID: {student['student_id']} | Name: {student['name']} | Major: {student['major']}")
+
+    def render(self):
+        for slot in range(len(self.students)):
+            self._set_row(slot)
+            card = self.row_widgets[slot][0]
+            if not card.winfo_ismapped(): card.pack(fill="x", pady=5, padx=5)
+        for card, _ in self.row_widgets[len(self.students):]: card.pack_forget()
+        if self.students: self.empty_label.pack_forget()
+        else: self.empty_label.pack(pady=20)
+        shown = f"{self.first_index + 1}-{self.first_index + len(self.students)}" if self.students else "0"
+        self.page_label.configure(text=f"Students {shown} of {self.total}")
+        self.prev_btn.configure(state="normal" if self.first_index > 0 else "disabled")
+        self.next_btn.configure(state="normal" if self.first_index + len(self.students) < self.total else "disabled")
+
+    def reload(self):
+        """Re-reads the current page (the first page on first use)."""
+        db = self.app.db_manager
+        start = self.key(self.students[0]) if self.students else None
+        self.students = db.get_students_page(self.PAGE_SIZE, start=start)
+        if not self.students and start: # the page emptied; fall back to the first one
+            self.students = db.get_students_page(self.PAGE_SIZE)
+        self.first_index = db.count_students(before=self.key(self.students[0])) if self.students else 0
+        self.total = db.count_students()
+        self.loaded = True
+        self.render()
+
+    def next_page(self):
+        if not self.students: return
+        page = self.app.db_manager.get_students_page(self.PAGE_SIZE, after=self.key(self.students[-1]))
+        if not page: return
+        self.first_index += len(self.students)
+        self.students = page
+        self.render()
+
+    def prev_page(self):
+        if not self.students: return
+        page = self.app.db_manager.get_students_page(self.PAGE_SIZE, before=self.key(self.students[0]))
+        if not page: return
+        self.first_index = max(0, self.first_index - len(page))
+        self.students = page
+        self.render()
+
+    def student_added(self):
+        """
+        Re-reads the current page so the new student lands where get_students_page orders it
+        (MySQL compares names case-insensitively, so sorting here could disagree with paging).
+        """
+        self.reload()
+
+    def student_updated(self, original_id, details):
+        """Updates one row in place; the page is re-sorted the next time it is read."""
+        for slot, student in enumerate(self.students):
+            if student['student_id'] == original_id:
+                student.update({k: v for k, v in details.items() if k in student})
+                self._set_row(slot)
+                return
+
+    def student_removed(self, student_id):
+        self.students = [s for s in self.students if s['student_id'] != student_id]
+        self.total -= 1
+        self.render()
+
+class RangeReportWindow(ctk.CTkToplevel):
+    """Attendance between two dates, per section and per student, from the daily rollups."""
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.title("Attendance Summary")
+        self.geometry("900x600")
+        self.transient(master)
+        self.master = master
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.pack(fill="x", padx=10, pady=10)
+        ctk.CTkLabel(filter_frame, text="From:").pack(side="left", padx=(10, 5))
+        self.start_entry = DateEntry(filter_frame, width=12, date_pattern='y-mm-dd')
+        self.start_entry.set_date(datetime.now() - timedelta(days=30))
+        self.start_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(filter_frame, text="To:").pack(side="left", padx=(10, 5))
+        self.end_entry = DateEntry(filter_frame, width=12, date_pattern='y-mm-dd')
+        self.end_entry.pack(side="left", padx=5)
+        self.section_entry = ctk.CTkEntry(filter_frame, placeholder_text="Section (all)", width=120)
+        self.section_entry.pack(side="left", padx=10)
+        ctk.CTkButton(filter_frame, text="Show", command=self.refresh).pack(side="left", padx=5)
+        ctk.CTkButton(filter_frame, text="Export Logs...", command=self.export_logs).pack(side="right", padx=10)
+
+        section_columns = ("section", "students", "school_days", "present_days", "percentage")
+        self.section_tree = ttk.Treeview(self, columns=section_columns, show="headings", height=5)
+        for col in section_columns:
+            self.section_tree.heading(col, text=col.replace("_", " ").title())
+            self.section_tree.column(col, width=120, anchor="center")
+        self.section_tree.pack(fill="x", padx=10, pady=(0, 10))
+
+        student_columns = ("id", "name", "section", "days_present", "school_days", "percentage")
+        self.student_tree = ttk.Treeview(self, columns=student_columns, show="headings")
+        for col in student_columns:
+            self.student_tree.heading(col, text=col.replace("_", " ").title())
+            self.student_tree.column(col, width=200 if col == "name" else 110, anchor="w" if col == "name" else "center")
+        self.student_tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.refresh()
+
+    def refresh(self):
+        start_date, end_date = self.start_entry.get_date(), self.end_entry.get_date()
+        if start_date > end_date:
+            messagebox.showerror("Error", "The start date is after the end date.", parent=self)
+            return
+        section = self.section_entry.get().strip()
+        db_manager = self.master.db_manager
+        self.section_tree.delete(*self.section_tree.get_children())
+        for record in db_manager.get_section_report(start_date, end_date):
+            if section and record['section'] != section: continue
+            self.section_tree.insert("", "end", values=(record['section'] or "---", record['students'], record['school_days'],
+                                                        record['present_days'], f"{record['percentage']}%"))
+        self.student_tree.delete(*self.student_tree.get_children())
+        for record in db_manager.get_range_report(start_date, end_date, section):
+            self.student_tree.insert("", "end", values=(record['student_id'], record['name'], record['section'], record['days_present'],
+                                                        record['school_days'], f"{record['percentage']}%"))
+
+    def export_logs(self):
+        """Exports every attendance log row in the selected range (progress shows on the Reports tab)."""
+        start_date, end_date = self.start_entry.get_date(), self.end_entry.get_date()
+        db = self.master.db_manager
+        self.master.start_export(f"attendance_{start_date}_{end_date}",
+                                 lambda: db.stream_attendance_logs(start_date, end_date), db.LOG_EXPORT_COLUMNS,
+                                 lambda: db.count_attendance_logs(start_date, end_date), parent=self)
+
 class App(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -165,10 +336,17 @@ class App(ctk.CTk):
         ctk.CTkRadioButton(launch_frame, text="Entry", variable=self.mode_var, value="entry").pack(side="left", padx=20, pady=10)
         ctk.CTkRadioButton(launch_frame, text="Exit", variable=self.mode_var, value="exit").pack(side="left", padx=20, pady=10)
         ctk.CTkButton(launch_frame, text="Start Camera", command=self.start_attendance).pack(side="right", padx=20, pady=10)
+        ctk.CTkButton(launch_frame, text="Start All Cameras", command=self.start_all_cameras).pack(side="right", padx=(20, 0), pady=10)
         manage_frame = ctk.CTkFrame(frame); manage_frame.pack(pady=10, padx=20, fill="x")
         ctk.CTkLabel(manage_frame, text="System Management", font=("Arial", 16)).pack(pady=5)
-        ctk.CTkButton(manage_frame, text="Generate Face Encodings", command=self.run_encoding).pack(pady=10, fill="x")
-        ctk.CTkButton(manage_frame, text="Daily Attendance Reset", command=self.run_daily_reset).pack(pady=10, fill="x")
+        self.encode_btn = ctk.CTkButton(manage_frame, text="Generate Face Encodings", command=self.run_encoding)
+        self.encode_btn.pack(pady=10, fill="x")
+        progress_frame = ctk.CTkFrame(manage_frame, fg_color="transparent"); progress_frame.pack(fill="x")
+        self.encode_progress = ctk.CTkProgressBar(progress_frame); self.encode_progress.set(0)
+        self.encode_progress.pack(side="left", padx=(0, 10), fill="x", expand=True)
+        self.encode_status = ctk.CTkLabel(progress_frame, text="", width=160, anchor="w"); self.encode_status.pack(side="left")
+        self.cancel_encode_btn = ctk.CTkButton(progress_frame, text="Cancel", width=80, state="disabled", command=self.cancel_encoding)
+        self.cancel_encode_btn.pack(side="right")
         return frame
 
     def create_manage_student_frame(self):
@@ -177,8 +355,8 @@ class App(ctk.CTk):
         top_bar = ctk.CTkFrame(frame); top_bar.pack(fill="x", padx=10, pady=10)
         ctk.CTkLabel(top_bar, text="Student Roster", font=("Arial", 20, "bold")).pack(side="left", padx=10)
         ctk.CTkButton(top_bar, text="Add New Student", command=self.open_add_student_window).pack(side="right", padx=10)
-        self.student_list_frame = ctk.CTkScrollableFrame(frame)
-        self.student_list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.roster = RosterView(frame, self)
+        self.roster.pack(fill="both", expand=True, padx=10, pady=10)
         return frame
 
     def create_reports_frame(self):
@@ -195,9 +373,14 @@ class App(ctk.CTk):
         ctk.CTkLabel(filter_frame, text="Search:").grid(row=0, column=2, padx=(20, 5), pady=10)
         self.search_entry = ctk.CTkEntry(filter_frame, placeholder_text="Type name or ID...")
         self.search_entry.grid(row=0, column=3, padx=5, pady=10, sticky="ew")
-        ctk.CTkButton(filter_frame, text="Search", command=self.search_daily_report).grid(row=0, column=4, padx=5, pady=10)
+        # Typing filters the loaded day in memory; the date picker and Refresh re-read the database.
+        self.search_entry.bind("<KeyRelease>", self.schedule_report_filter)
+        self.report_date_entry.bind("<<DateEntrySelected>>", lambda event: self.search_daily_report())
+        self.report_index, self.filter_job, self.sort_column, self.sort_reverse = None, None, None, False
+        ctk.CTkButton(filter_frame, text="Refresh", command=self.search_daily_report).grid(row=0, column=4, padx=5, pady=10)
         ctk.CTkButton(filter_frame, text="Clear", command=self.clear_filters).grid(row=0, column=5, padx=5, pady=10)
-        ctk.CTkButton(filter_frame, text="Export to CSV", command=self.export_to_csv).grid(row=0, column=6, padx=(20, 10), pady=10)
+        ctk.CTkButton(filter_frame, text="Export...", command=self.export_to_csv).grid(row=0, column=6, padx=(20, 5), pady=10)
+        ctk.CTkButton(filter_frame, text="Date Range Summary", command=lambda: RangeReportWindow(self)).grid(row=0, column=7, padx=(5, 10), pady=10)
         style = ttk.Style()
         style.theme_use("default")
         style.configure("Treeview", background="#2a2d2e", foreground="white", fieldbackground="#343638", borderwidth=0, rowheight=25)
@@ -218,32 +401,18 @@ class App(ctk.CTk):
         self.log_tree.column("entry_time", width=120, anchor="center")
         self.log_tree.column("exit_time", width=120, anchor="center")
         self.log_tree.grid(row=0, column=0, sticky="nsew")
+        export_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        export_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.export_progress = ctk.CTkProgressBar(export_frame); self.export_progress.set(0)
+        self.export_progress.pack(side="left", padx=(0, 10), fill="x", expand=True)
+        self.export_status = ctk.CTkLabel(export_frame, text="", width=220, anchor="w"); self.export_status.pack(side="left")
+        self.cancel_export_btn = ctk.CTkButton(export_frame, text="Cancel", width=80, state="disabled", command=self.cancel_export)
+        self.cancel_export_btn.pack(side="right")
+        self.export_cancel = None
         return frame
 
-    ### --- MODIFIED refresh_student_list --- ###
     def refresh_student_list(self):
-        for widget in self.student_list_frame.winfo_children(): widget.destroy()
-        
-        students = self.db_manager.get_all_students()
-        if not students:
-            ctk.CTkLabel(self.student_list_frame, text="No students found.").pack(pady=20)
-            return
-
-        for student in students:
-            # Create a "card" for each student
-            card = ctk.CTkFrame(self.student_list_frame)
-            card.pack(fill="x", pady=5, padx=5)
-            card.grid_columnconfigure(0, weight=1)
-
-            info = f"ID: {student['student_id']} | Name: {student['name']} | Major: {student['major']}"
-            ctk.CTkLabel(card, text=info, anchor="w").grid(row=0, column=0, padx=10, pady=10, sticky="w")
-            
-            # Use a lambda function to pass the current student's data to the command
-            edit_btn = ctk.CTkButton(card, text="Edit", width=60, command=lambda s=student: self.open_edit_student_window(s))
-            edit_btn.grid(row=0, column=1, padx=5, pady=5)
-            
-            delete_btn = ctk.CTkButton(card, text="Delete", width=60, fg_color="#D2691E", hover_color="#8B4513", command=lambda id=student['student_id']: self.delete_student(id))
-            delete_btn.grid(row=0, column=2, padx=(0, 10), pady=5)
+        self.roster.reload()
     
     # (show frames methods remain the same)
     def show_dashboard_frame(self):
@@ -266,32 +435,96 @@ class App(ctk.CTk):
         self.search_entry.delete(0, 'end')
         self.report_date_entry.set_date(datetime.now())
         self.search_daily_report()
+    REPORT_FIELDS = {"id": "student_id", "name": "name", "section": "section", "status": "status",
+                     "entry_time": "entry_time", "exit_time": "exit_time"}
     def search_daily_report(self):
-        for item in self.log_tree.get_children(): self.log_tree.delete(item)
+        """Reads the selected day's report once; searching and sorting then work on that copy."""
         report_date = self.report_date_entry.get_date()
-        search_term = self.search_entry.get()
-        report_data = self.db_manager.get_daily_report(report_date, search_term)
-        for record in report_data:
+        report_data = self.db_manager.get_daily_report(report_date)
+        self.report_index = ReportIndex(report_data)
+        self.log_tree.delete(*self.log_tree.get_children())
+        for index, record in enumerate(report_data):
             entry_time = record['entry_time'].strftime('%I:%M:%S %p') if record['entry_time'] else "---"
             exit_time = record['exit_time'].strftime('%I:%M:%S %p') if record['exit_time'] else "---"
-            self.log_tree.insert("", "end", values=(record['student_id'], record['name'], record['section'], record['status'], entry_time, exit_time))
+            self.log_tree.insert("", "end", iid=str(index), values=(record['student_id'], record['name'], record['section'], record['status'], entry_time, exit_time))
+        self.apply_report_view()
+    def schedule_report_filter(self, event=None):
+        # Debounce: filter once typing pauses instead of on every keystroke.
+        if self.filter_job: self.after_cancel(self.filter_job)
+        self.filter_job = self.after(150, self.apply_report_view)
+    def apply_report_view(self):
+        """Shows the rows matching the search in the current sort order with a single Treeview call."""
+        self.filter_job = None
+        if self.report_index is None: return
+        indices = self.report_index.search(self.search_entry.get())
+        if self.sort_column:
+            indices = self.report_index.sort(indices, self.REPORT_FIELDS[self.sort_column], self.sort_reverse)
+        # Rows left out are detached, not deleted, so clearing the search brings them back without re-inserting.
+        self.log_tree.set_children("", *map(str, indices))
     def sort_treeview_column(self, col, reverse):
-        data_list = [(self.log_tree.set(k, col), k) for k in self.log_tree.get_children('')]
-        try: data_list.sort(key=lambda t: int(t[0]), reverse=reverse)
-        except ValueError: data_list.sort(key=lambda t: t[0], reverse=reverse)
-        for index, (val, k) in enumerate(data_list): self.log_tree.move(k, '', index)
+        self.sort_column, self.sort_reverse = col, reverse
+        self.apply_report_view()
         self.log_tree.heading(col, command=lambda: self.sort_treeview_column(col, not reverse))
     def export_to_csv(self):
-        filepath = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        """Exports the daily report for the selected date and search straight from the database."""
+        report_date, search_term = self.report_date_entry.get_date(), self.search_entry.get().strip()
+        db = self.db_manager
+        # Rows and total use the same substring filter as the live search, so progress ends at 100%.
+        self.start_export(f"attendance_{report_date}",
+                          lambda: db.stream_daily_report(report_date, search_term, contains=True), db.DAILY_REPORT_COLUMNS,
+                          lambda: db.count_daily_report(report_date, search_term, contains=True))
+    def start_export(self, default_name, make_chunks, columns, count, parent=None):
+        """
+        Asks for a CSV/Parquet path and streams rows from a DatabaseManager cursor to it on a worker
+        thread; progress comes back through a queue polled by the Tk main loop, like encoding.
+        """
+        if self.export_cancel is not None:
+            messagebox.showwarning("Busy", "An export is already running.", parent=parent)
+            return
+        filepath = filedialog.asksaveasfilename(parent=parent, initialfile=default_name, defaultextension=".csv",
+                                                filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")])
         if not filepath: return
-        try:
-            with open(filepath, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow([self.log_tree.heading(c)["text"] for c in self.log_tree["columns"]])
-                for item_id in self.log_tree.get_children(): writer.writerow(self.log_tree.item(item_id)["values"])
-            messagebox.showinfo("Success", f"Data exported to {filepath}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export data: {e}")
+        self.export_queue = queue.Queue()
+        self.export_cancel = threading.Event()
+        def worker():
+            try:
+                total = count()
+                self.export_queue.put(("progress", 0, total))
+                rows = export_chunks(make_chunks(), columns, filepath, total=total, cancel_event=self.export_cancel,
+                                     progress=lambda done, total: self.export_queue.put(("progress", done, total)))
+                self.export_queue.put(("done", rows, filepath))
+            except Exception as e:
+                self.export_queue.put(("error", e))
+        self.cancel_export_btn.configure(state="normal")
+        self.export_progress.set(0)
+        self.export_status.configure(text="Exporting...")
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(100, self.poll_export)
+    def poll_export(self):
+        while True:
+            try: message = self.export_queue.get_nowait()
+            except queue.Empty: break
+            if message[0] == "progress":
+                _, done, total = message
+                self.export_progress.set(done / total if total else 1)
+                self.export_status.configure(text=f"{done}/{total} rows")
+                continue
+            self.export_cancel = None
+            self.cancel_export_btn.configure(state="disabled")
+            if message[0] == "error":
+                self.export_status.configure(text="Failed")
+                messagebox.showerror("Error", f"Failed to export data: {message[1]}")
+            elif message[1] is None:
+                self.export_status.configure(text="Cancelled")
+            else:
+                self.export_status.configure(text=f"Exported {message[1]} rows")
+                messagebox.showinfo("Success", f"Data exported to {message[2]}")
+            return
+        self.after(100, self.poll_export)
+    def cancel_export(self):
+        if self.export_cancel: self.export_cancel.set()
+        self.cancel_export_btn.configure(state="disabled")
+        self.export_status.configure(text="Cancelling...")
             
     ### --- NEW METHODS FOR EDIT/DELETE --- ###
     def open_add_student_window(self):
@@ -304,15 +537,15 @@ class App(ctk.CTk):
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to permanently delete student {student_id}?"):
             if self.db_manager.delete_student(student_id):
                 messagebox.showinfo("Success", f"Student {student_id} has been deleted.")
-                self.refresh_student_list()
+                self.roster.student_removed(student_id)
             else:
                 messagebox.showerror("Error", f"Failed to delete student {student_id}.")
 
     # (Button Command Methods remain unchanged)
     def start_attendance(self):
         mode = self.mode_var.get()
-        if not os.path.exists('EncodeFile.p'):
-            messagebox.showerror("Error", "EncodeFile.p not found.")
+        if not ensure_store():
+            messagebox.showerror("Error", f"{EMBEDDINGS_FILE} not found. Generate face encodings first.")
             return
         def run_system():
             attendance_app = AttendanceSystem(mode=mode)
@@ -321,14 +554,64 @@ class App(ctk.CTk):
         attendance_thread.daemon = True
         attendance_thread.start()
         messagebox.showinfo("Info", f"Camera starting in '{mode}' mode.", parent=self)
+    def start_all_cameras(self):
+        cameras = load_camera_configs()
+        if not cameras:
+            messagebox.showerror("Error", "No cameras configured. Add [camera.<name>] sections to config.ini.")
+            return
+        if not ensure_store():
+            messagebox.showerror("Error", f"{EMBEDDINGS_FILE} not found. Generate face encodings first.")
+            return
+        threading.Thread(target=run_cameras, args=(cameras,), daemon=True).start()
+        names = ", ".join(f"{name} ({mode})" for name, _, mode in cameras)
+        messagebox.showinfo("Info", f"Starting {len(cameras)} cameras: {names}", parent=self)
     def run_encoding(self):
-        if messagebox.askyesno("Confirm", "This will encode all images. Continue?"):
-            if generate_encodings(): messagebox.showinfo("Success", "Face encodings generated.")
-            else: messagebox.showwarning("Warning", "Encoding failed.")
-    def run_daily_reset(self):
-        if messagebox.askyesno("Confirm", "Reset daily status for all students?"):
-            rows = self.db_manager.daily_reset()
-            messagebox.showinfo("Success", f"Daily status reset for {rows} students.")
+        if not messagebox.askyesno("Confirm", "This will encode all images. Continue?"): return
+        # Encoding runs in a process pool driven from a worker thread; progress comes back
+        # through a queue that the Tk main loop polls, so the GUI stays responsive.
+        self.encode_queue = queue.Queue()
+        self.encode_cancel = threading.Event()
+        def worker():
+            try:
+                result = generate_encodings(progress=lambda done, total, name: self.encode_queue.put(("progress", done, total)),
+                                            cancel_event=self.encode_cancel)
+                self.encode_queue.put(("done", result))
+            except Exception as e:
+                self.encode_queue.put(("error", e))
+        self.encode_btn.configure(state="disabled")
+        self.cancel_encode_btn.configure(state="normal")
+        self.encode_progress.set(0)
+        self.encode_status.configure(text="Starting...")
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(100, self.poll_encoding)
+    def poll_encoding(self):
+        while True:
+            try: message = self.encode_queue.get_nowait()
+            except queue.Empty: break
+            if message[0] == "progress":
+                _, done, total = message
+                self.encode_progress.set(done / total if total else 0)
+                self.encode_status.configure(text=f"{done}/{total} images")
+            else:
+                self.encode_btn.configure(state="normal")
+                self.cancel_encode_btn.configure(state="disabled")
+                if message[0] == "error":
+                    self.encode_status.configure(text="Failed")
+                    messagebox.showerror("Error", f"Encoding failed: {message[1]}")
+                elif message[1]:
+                    self.encode_status.configure(text="Complete")
+                    messagebox.showinfo("Success", "Face encodings generated.")
+                elif self.encode_cancel.is_set():
+                    self.encode_status.configure(text="Cancelled")
+                else:
+                    self.encode_status.configure(text="Failed")
+                    messagebox.showwarning("Warning", "Encoding failed.")
+                return
+        self.after(100, self.poll_encoding)
+    def cancel_encoding(self):
+        self.encode_cancel.set()
+        self.cancel_encode_btn.configure(state="disabled")
+        self.encode_status.configure(text="Cancelling...")
 
 
 if __name__ == "__main__":
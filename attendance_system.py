@@ -1,127 +1,449 @@
 import cv2
-import pickle
-import face_recognition
+import configparser
 import numpy as np
 import os
+import threading
+import time
+from collections import deque
 from database_manager import DatabaseManager
+from attendance_writer import AttendanceWriter
+from embedding_store import ensure_store, load_embeddings
+from face_detector import FaceDetector
+from face_matcher import create_matcher
+from face_tracker import FaceTracker
+from metrics import Metrics
+from motion_gate import MotionGate
 from datetime import datetime, timedelta
 
+def load_camera_configs(config_file='config.ini'):
+    """Returns (name, source, mode) for every [camera.<name>] section in config.ini."""
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    cameras = []
+    for section in config.sections():
+        if not section.startswith('camera.'): continue
+        source = config.get(section, 'source', fallback='0')
+        cameras.append((section[len('camera.'):], int(source) if source.isdigit() else source,
+                        config.get(section, 'mode', fallback='entry')))
+    return cameras
+
+class RecognitionEngine:
+    """
+    Recognition shared by every camera in the process: one gallery and matcher, one database
+    manager and attendance writer, and a pool of workers that serve the cameras round-robin.
+    Each camera holds at most `queue_size` waiting frames (oldest dropped first) and is served
+    by one worker at a time, so a busy camera cannot starve the others.
+    """
+    def __init__(self, config_file='config.ini', use_database=True):
+        config = configparser.ConfigParser()
+        config.read(config_file)
+        self.config = config
+        self.matcher_backend = config.get('matcher', 'backend', fallback='brute')
+        self.matcher_nprobe = config.getint('matcher', 'nprobe', fallback=8)
+        self.recognition_workers = config.getint('pipeline', 'recognition_workers', fallback=1)
+        self.queue_size = config.getint('pipeline', 'queue_size', fallback=1)
+        self.detector = FaceDetector.from_config(config)
+        self.metrics = Metrics.from_config(config)
+        # Without a database (e.g. a headless dry run) the engine only detects and matches.
+        self.db_manager, self.writer = None, None
+        if use_database:
+            self.db_manager = DatabaseManager(config_file)
+            self.writer = AttendanceWriter(self.db_manager,
+                                           batch_size=config.getint('writer', 'batch_size', fallback=100),
+                                           flush_interval=config.getfloat('writer', 'flush_interval', fallback=0.2),
+                                           on_result=self._on_attendance_result, metrics=self.metrics)
+
+        self.load_encodings()
+        if self.db_manager: self.db_manager.warm_attendance_state()
+
+        self.streams = []
+        self.pending = {}
+        self.ready = deque()
+        self.busy = set()
+        self.schedule = threading.Condition()
+        self.dropped_frames = 0
+        self.threads = []
+        self.is_running = False
+
+    def load_encodings(self):
+        # The store is memory-mapped: encode_list_known is a (count, 128) float32 matrix
+        # backed by the file, not a list that has to be unpickled and converted.
+        if ensure_store():
+            self.encode_list_known, self.student_ids, _ = load_embeddings()
+            print("Encode File Loaded.")
+        else:
+            self.encode_list_known, self.student_ids = np.empty((0, 128), np.float32), []
+        self.matcher = create_matcher(self.encode_list_known, self.student_ids, self.matcher_backend, self.matcher_nprobe)
+
+    def create_tracker(self):
+        config = self.config
+        return FaceTracker(
+            iou_threshold=config.getfloat('tracking', 'iou_threshold', fallback=0.3),
+            identity_ttl=config.getfloat('tracking', 'identity_ttl', fallback=5.0),
+            retry_interval=config.getfloat('tracking', 'retry_interval', fallback=0.5),
+            max_age=config.getfloat('tracking', 'max_age', fallback=2.0))
+
+    def create_motion_gate(self):
+        """A camera's motion gate from [motion], or None when detection should run on every frame."""
+        config = self.config
+        if not config.getboolean('motion', 'enabled', fallback=True): return None
+        return MotionGate(
+            pixel_threshold=config.getint('motion', 'pixel_threshold', fallback=25),
+            min_area=config.getfloat('motion', 'min_area', fallback=0.005),
+            idle_fps=config.getfloat('motion', 'idle_fps', fallback=2.0),
+            hold=config.getfloat('motion', 'hold', fallback=2.0))
+
+    def register(self, stream):
+        with self.schedule:
+            self.streams.append(stream)
+            self.pending[stream] = deque()
+
+    def unregister(self, stream):
+        with self.schedule:
+            if stream in self.streams: self.streams.remove(stream)
+            self.pending.pop(stream, None)
+            if stream in self.ready: self.ready.remove(stream)
+
+    def start(self):
+        if self.is_running: return
+        self.is_running = True
+        if self.writer: self.writer.start()
+        self.metrics.start()
+        self.threads = [threading.Thread(target=self._recognition_loop, daemon=True) for _ in range(self.recognition_workers)]
+        for thread in self.threads: thread.start()
+
+    def stop(self):
+        self.is_running = False
+        with self.schedule: self.schedule.notify_all()
+        for thread in self.threads: thread.join(timeout=2.0)
+        self.threads = []
+        if self.writer: self.writer.stop()
+        self.metrics.stop()
+
+    def submit(self, stream, img):
+        """Queues a frame from a camera, dropping that camera's oldest waiting frame if it is behind."""
+        with self.schedule:
+            frames = self.pending.get(stream)
+            if frames is None: return
+            if len(frames) >= self.queue_size:
+                frames.popleft()
+                self.dropped_frames += 1
+                self.metrics.count('dropped_frames')
+                stream.dropped_frames += 1
+            frames.append(img)
+            if stream not in self.busy and stream not in self.ready:
+                self.ready.append(stream)
+                self.schedule.notify()
+
+    def _next_job(self):
+        with self.schedule:
+            while self.is_running and not self.ready:
+                self.schedule.wait(timeout=0.5)
+            if not self.is_running: return None, None
+            stream = self.ready.popleft()
+            self.busy.add(stream)
+            return stream, self.pending[stream].popleft()
+
+    def _finish_job(self, stream):
+        with self.schedule:
+            self.busy.discard(stream)
+            if self.pending.get(stream):
+                self.ready.append(stream)
+                self.schedule.notify()
+
+    def _recognition_loop(self):
+        while self.is_running:
+            stream, img = self._next_job()
+            if stream is None: continue
+            try:
+                self.recognize(stream, img)
+            finally:
+                self._finish_job(stream)
+
+    def recognize(self, stream, img, now=None):
+        """
+        Detect -> track -> encode for one frame of `stream`; the encodings of faces that need
+        identifying go to stream.process_face. Returns the number of faces detected.
+        `now` is the frame's time in seconds (defaults to the monotonic clock).
+        """
+        detector, metrics, gate = self.detector, self.metrics, stream.motion_gate
+        frame_time = time.monotonic() if now is None else now
+        if gate and not gate.due(frame_time):
+            metrics.count('frames_idle')
+            return 0
+        with metrics.timer('resize'):
+            img_s = detector.downscale(img)
+
+        # An unchanged scene skips HOG detection; differencing the small frame costs well under 1ms.
+        idle_gap = None
+        if gate:
+            with metrics.timer('motion'):
+                run_detection, idle_gap = gate.check(img_s, frame_time)
+            if not run_detection:
+                metrics.count('frames_idle')
+                return 0
+
+        started = time.perf_counter()
+        with metrics.timer('detect'):
+            face_locations = detector.detect(img, img_s)
+        # Wake-up latency: how long the change could have gone unseen while idle, plus the detection it woke.
+        if idle_gap is not None: metrics.record('wake', idle_gap + time.perf_counter() - started)
+        metrics.count('frames_recognized')
+        if not face_locations: return 0
+        metrics.count('faces_detected', len(face_locations))
+        if gate: gate.saw_faces(frame_time)
+
+        # Faces already identified on earlier frames keep their identity; only new tracks
+        # and expired identities pay for the 128-d encoding pass.
+        tracks = stream.tracker.update(face_locations, now)
+        pending = [i for i, track in enumerate(tracks) if stream.tracker.needs_encoding(track, now)]
+        if pending:
+            with metrics.timer('encode'):
+                encode_cur_frame = detector.encode(img, [face_locations[i] for i in pending])
+            metrics.count('faces_encoded', len(pending))
+            stream.process_face(encode_cur_frame, [tracks[i] for i in pending], now)
+        return len(face_locations)
+
+    def _on_attendance_result(self, student_id, mode, info):
+        for stream in list(self.streams):
+            stream._on_attendance_result(student_id, mode, info)
+
 class AttendanceSystem:
-    def __init__(self, mode="entry"):
+    """One camera: capture, per-camera tracking and overlay, sharing a RecognitionEngine."""
+    def __init__(self, mode="entry", config_file='config.ini', source=0, engine=None, name="Face Attendance"):
         self.mode = mode
-        self.db_manager = DatabaseManager()
-        self.cap = cv2.VideoCapture(0)
+        self.name = name
+        self.owns_engine = engine is None
+        self.engine = engine or RecognitionEngine(config_file)
+        self.db_manager = self.engine.db_manager
+        self.matcher = self.engine.matcher
+        self.tracker = self.engine.create_tracker()
+        self.motion_gate = self.engine.create_motion_gate()
+        self.cap = cv2.VideoCapture(source)
         self.cap.set(3, 640)
         self.cap.set(4, 480)
-        
+
         self.UI_WIDTH, self.UI_HEIGHT = 1280, 720
         self.BG_COLOR = (21, 21, 21)
         self.UI_COLOR = (45, 45, 45)
         self.TEXT_COLOR = (255, 255, 255)
         self.SUCCESS_COLOR = (0, 255, 0)
         self.ERROR_COLOR = (0, 0, 255)
-
-        self.load_encodings()
+        # Reused UI buffer and the static layer it is restored from; see _draw_ui.
+        self.ui_frame, self.static_layer, self.drawn_blocks = None, None, {}
 
         self.mode_type = "active"
         self.counter = 0
         self.student_id = -1
         self.student_info = None
         self.status_message = ""
+        self.marked_count = 0
         self.is_running = False
 
-    def load_encodings(self):
-        try:
-            with open('EncodeFile.p', 'rb') as file:
-                self.encode_list_known, self.student_ids = pickle.load(file)
-            print("Encode File Loaded.")
-        except FileNotFoundError:
-            self.encode_list_known, self.student_ids = [], []
+        # Pipeline state: the capture thread publishes only the latest frame, the engine's
+        # recognition workers take frames submitted by the display stage.
+        self.frame_ready = threading.Condition()
+        self.latest_frame, self.frame_seq, self.shown_seq = None, 0, 0
+        self.state_lock = threading.Lock()
+        self.dropped_frames = 0
+        self.capture_thread = None
+
+    # Text blocks of the UI as (top, bottom, left, right) pixel bounds; each is redrawn only when its content changes.
+    CLOCK_BLOCK = (65, 115, 700, 1280)
+    STUDENT_BLOCK = (160, 400, 700, 1280)
+    STATUS_BLOCK = (620, 715, 700, 1280)
+    METRICS_BLOCK = (600, 720, 0, 700)
+
+    def _build_static_layer(self):
+        """Background, side panel and mode label: drawn once per window rather than per frame."""
+        static = np.full((self.UI_HEIGHT, self.UI_WIDTH, 3), self.BG_COLOR, np.uint8)
+        cv2.rectangle(static, (700, 0), (self.UI_WIDTH, self.UI_HEIGHT), self.UI_COLOR, cv2.FILLED)
+        cv2.putText(static, f"MODE: {self.mode.upper()}", (720, 50), cv2.FONT_HERSHEY_DUPLEX, 1, self.TEXT_COLOR, 2)
+        self.static_layer, self.ui_frame, self.drawn_blocks = static, static.copy(), {}
+
+    def _dirty(self, block, content):
+        """True if `block` must be redrawn for `content`, in which case it is first reset to the static layer."""
+        if self.drawn_blocks.get(block) == content: return False
+        self.drawn_blocks[block] = content
+        top, bottom, left, right = block
+        self.ui_frame[top:bottom, left:right] = self.static_layer[top:bottom, left:right]
+        return True
 
     def _draw_ui(self, frame):
-        ui_frame = np.full((self.UI_HEIGHT, self.UI_WIDTH, 3), self.BG_COLOR, np.uint8)
-        frame_resized = cv2.resize(frame, (640, 480))
-        ui_frame[120:600, 30:670] = frame_resized
-
-        cv2.rectangle(ui_frame, (700, 0), (self.UI_WIDTH, self.UI_HEIGHT), self.UI_COLOR, cv2.FILLED)
-        cv2.putText(ui_frame, f"MODE: {self.mode.upper()}", (720, 50), cv2.FONT_HERSHEY_DUPLEX, 1, self.TEXT_COLOR, 2)
-        cv2.putText(ui_frame, datetime.now().strftime("%I:%M:%S %p"), (720, 100), cv2.FONT_HERSHEY_DUPLEX, 1, self.TEXT_COLOR, 2)
-        
+        """
+        Composites the UI into a buffer reused across frames: only the camera view is copied
+        every frame, and the clock, student panel and status line are re-rendered only when
+        their text changes.
+        """
+        if self.ui_frame is None: self._build_static_layer()
+        ui_frame = self.ui_frame
+        if frame.shape[:2] == (480, 640): ui_frame[120:600, 30:670] = frame
+        else: ui_frame[120:600, 30:670] = cv2.resize(frame, (640, 480))
+
+        clock = datetime.now().strftime("%I:%M:%S %p")
+        if self._dirty(self.CLOCK_BLOCK, clock):
+            cv2.putText(ui_frame, clock, (720, 100), cv2.FONT_HERSHEY_DUPLEX, 1, self.TEXT_COLOR, 2)
+
         if self.mode_type == "marked":
-            cv2.putText(ui_frame, "MARKED", (720, 680), cv2.FONT_HERSHEY_DUPLEX, 2, self.SUCCESS_COLOR, 3)
+            status = ("MARKED" if self.marked_count <= 1 else f"MARKED x{self.marked_count}", 2, self.SUCCESS_COLOR, 3)
         elif self.mode_type == "error":
-            cv2.putText(ui_frame, self.status_message, (720, 680), cv2.FONT_HERSHEY_DUPLEX, 1.2, self.ERROR_COLOR, 2)
-        
-        if self.student_info:
+            status = (self.status_message, 1.2, self.ERROR_COLOR, 2)
+        else:
+            status = None
+        if self._dirty(self.STATUS_BLOCK, status) and status:
+            text, font_scale, color, thickness = status
+            cv2.putText(ui_frame, text, (720, 680), cv2.FONT_HERSHEY_DUPLEX, font_scale, color, thickness)
+
+        # Until the write-behind result arrives only the ID is known, so draw what is there.
+        fields = [("ID", 'student_id'), ("Name", 'name'), ("Major", 'major'), ("Year", 'year'), ("Present Days", 'total_present')]
+        info = self.student_info
+        lines = tuple(f"{label}: {info[key]}" if key in info else None for label, key in fields) if info else ()
+        if self._dirty(self.STUDENT_BLOCK, lines):
             y0, dy = 200, 45
-            cv2.putText(ui_frame, f"ID: {self.student_info['student_id']}", (720, y0), cv2.FONT_HERSHEY_PLAIN, 2.5, self.TEXT_COLOR, 2)
-            cv2.putText(ui_frame, f"Name: {self.student_info['name']}", (720, y0 + dy), cv2.FONT_HERSHEY_PLAIN, 2.5, self.TEXT_COLOR, 2)
-            cv2.putText(ui_frame, f"Major: {self.student_info['major']}", (720, y0 + 2*dy), cv2.FONT_HERSHEY_PLAIN, 2.5, self.TEXT_COLOR, 2)
-            cv2.putText(ui_frame, f"Year: {self.student_info['year']}", (720, y0 + 3*dy), cv2.FONT_HERSHEY_PLAIN, 2.5, self.TEXT_COLOR, 2)
-            cv2.putText(ui_frame, f"Present Days: {self.student_info['total_present']}", (720, y0 + 4*dy), cv2.FONT_HERSHEY_PLAIN, 2.5, self.TEXT_COLOR, 2)
+            for row, line in enumerate(lines):
+                if line: cv2.putText(ui_frame, line, (720, y0 + row*dy), cv2.FONT_HERSHEY_PLAIN, 2.5, self.TEXT_COLOR, 2)
         return ui_frame
 
-    def run(self):
-        self.is_running = True
+    def _draw_metrics(self, ui_frame):
+        """Stage latencies (p50/p95/p99) and counters in the strip under the camera view."""
+        lines = self.engine.metrics.overlay_lines()
+        if not self._dirty(self.METRICS_BLOCK, tuple(lines[:12])): return
+        for i, line in enumerate(lines[:12]):
+            x, y = 30 + (i // 6) * 330, 618 + (i % 6) * 17
+            cv2.putText(ui_frame, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.1, self.TEXT_COLOR, 1)
+
+    def _capture_loop(self):
+        """Reads the camera as fast as it delivers, keeping only the newest frame."""
+        timer = self.engine.metrics.timer
         while self.is_running:
-            success, img = self.cap.read()
-            if not success: break
-            
-            ui_frame = self._draw_ui(img)
+            with timer('capture'):
+                success, img = self.cap.read()
+            with self.frame_ready:
+                if not success:
+                    self.is_running = False
+                else:
+                    self.latest_frame, self.frame_seq = img, self.frame_seq + 1
+                self.frame_ready.notify_all()
+
+    def start(self):
+        """Starts capturing and registers this camera with the engine."""
+        self.is_running = True
+        self.engine.register(self)
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.capture_thread.start()
+
+    def next_ui_frame(self, timeout=1.0):
+        """
+        Display stage for one frame: waits for a new camera frame, hands it to the engine if no
+        message is showing, and returns the rendered UI (None if no new frame arrived). The UI
+        buffer is reused, so the caller must display or copy it before the next call.
+        """
+        with self.frame_ready:
+            self.frame_ready.wait_for(lambda: self.frame_seq != self.shown_seq or not self.is_running, timeout=timeout)
+            if self.frame_seq == self.shown_seq: return None
+            img, self.shown_seq = self.latest_frame, self.frame_seq
+        if not self.is_running: return None
 
+        with self.state_lock:
             if self.counter == 0:
                 self.mode_type = "active"
-                img_s = cv2.resize(img, (0, 0), None, 0.25, 0.25)
-                img_s_rgb = cv2.cvtColor(img_s, cv2.COLOR_BGR2RGB)
-                
-                face_locations = face_recognition.face_locations(img_s_rgb)
-                encode_cur_frame = face_recognition.face_encodings(img_s_rgb, face_locations)
-                
-                if face_locations:
-                    self.process_face(encode_cur_frame)
-            
+                self.engine.submit(self, img)
+
+            with self.engine.metrics.timer('draw'):
+                ui_frame = self._draw_ui(img)
+            if self.engine.metrics.overlay: self._draw_metrics(ui_frame)
+
             if self.counter > 0:
                 self.counter += 1
                 if self.counter > 25: # Display message for ~1 second
                     self.counter, self.student_info, self.status_message = 0, None, ""
+        return ui_frame
 
-            cv2.imshow("Face Attendance", ui_frame)
+    def run(self):
+        self.engine.start()
+        self.start()
+        while self.is_running:
+            ui_frame = self.next_ui_frame()
+            if ui_frame is None: continue
+            cv2.imshow(self.name, ui_frame)
             if cv2.waitKey(1) == 27: self.stop()
-
-    def process_face(self, encode_cur_frame):
-        if not self.encode_list_known: return
-        
-        face_dis = face_recognition.face_distance(self.encode_list_known, encode_cur_frame[0])
-        match_index = np.argmin(face_dis)
-        
-        if face_dis[match_index] < 0.50: # Stricter threshold
-            self.student_id = self.student_ids[match_index]
-            self.counter = 1
-            # --- We will add the database logging logic in the next step ---
-            self.mode_type = "marked"
-            self.student_info = self.db_manager.get_student_info(self.student_id)
+        self.stop()
 
     def stop(self):
         self.is_running = False
+        self.engine.unregister(self)
+        if self.capture_thread and self.capture_thread is not threading.current_thread():
+            self.capture_thread.join(timeout=2.0)
+        self.capture_thread = None
         self.cap.release()
-        cv2.destroyAllWindows()
-      
-    def process_face(self, encode_cur_frame):
-        if not self.encode_list_known: return
-        
-        face_dis = face_recognition.face_distance(self.encode_list_known, encode_cur_frame[0])
-        match_index = np.argmin(face_dis)
-        
-        if face_dis[match_index] < 0.50:
-            self.student_id = self.student_ids[match_index]
-            self.counter = 1 # Start the display timer
+        if self.owns_engine:
+            self.engine.stop()
+            cv2.destroyAllWindows()
 
-            # Log attendance and get the result
-            status, info = self.db_manager.log_attendance(self.student_id, self.mode)
-            self.student_info = info # Display the student's info regardless of status
-            
+    def process_face(self, encode_cur_frame, tracks=None, now=None):
+        metrics = self.engine.metrics
+        with metrics.timer('match'):
+            matches = self.matcher.match(encode_cur_frame)
+        if tracks: self.tracker.assign(tracks, matches, now)
+        if not matches: return
+        metrics.count('matches', len(matches))
+
+        # Cooldown and presence are decided in memory; accepted events are written behind by
+        # the engine's writer and the overlay's student details are filled in once the batch commits.
+        marked_count, shown = 0, None
+        now = datetime.now()
+        for face_index, student_id, distance in matches:
+            with metrics.timer('decide'):
+                status = self.db_manager.decide_attendance(student_id, self.mode, now)
+            metrics.count(status.lower().replace(' ', '_'))
+            if status == "Success":
+                self.engine.writer.submit(student_id, self.mode, now)
+                marked_count += 1
+                if shown is None or shown[1] != "Success": shown = (student_id, status)
+            elif shown is None:
+                shown = (student_id, status)
+
+        with self.state_lock:
+            self.student_id, status = shown
+            self.student_info = {'student_id': self.student_id}
+            self.counter = 1 # Start the display timer
+            self.marked_count = marked_count
             if status == "Success":
                 self.mode_type = "marked"
             else:
                 self.mode_type = "error"
-                self.status_message = status # E.g., "Cooldown" or "Not Present"
\ No newline at end of file
+                self.status_message = status # E.g., "Cooldown" or "Not Present"
+        if status != "Success":
+            info = self.db_manager.get_student_info(self.student_id)
+            self._on_attendance_result(self.student_id, self.mode, info)
+
+    def _on_attendance_result(self, student_id, mode, info):
+        with self.state_lock:
+            if self.counter > 0 and student_id == self.student_id and info:
+                self.student_info = info
+
+def run_cameras(cameras=None, config_file='config.ini'):
+    """
+    Serves several cameras from one process: one RecognitionEngine, one capture thread per
+    camera, and a single display loop (HighGUI windows must all be driven from one thread).
+    """
+    cameras = cameras or load_camera_configs(config_file)
+    if not cameras:
+        print("No [camera.<name>] sections configured.")
+        return
+    engine = RecognitionEngine(config_file)
+    streams = [AttendanceSystem(mode=mode, source=source, engine=engine, name=f"Face Attendance - {name}")
+               for name, source, mode in cameras]
+    engine.start()
+    for stream in streams: stream.start()
+    try:
+        while any(stream.is_running for stream in streams):
+            for stream in streams:
+                if not stream.is_running: continue
+                ui_frame = stream.next_ui_frame(timeout=0)
+                if ui_frame is not None: cv2.imshow(stream.name, ui_frame)
+            if cv2.waitKey(1) == 27: break
+    finally:
+        for stream in streams: stream.stop()
+        engine.stop()
+        cv2.destroyAllWindows()
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from datetime import datetime
+
+class AttendanceWriter:
+    """
+    Write-behind queue for accepted attendance events. The camera loop decides an event with
+    DatabaseManager.decide_attendance, submits it and returns at once; a background thread
+    commits the queue in batches through DatabaseManager.write_attendance_batch.
+    A single writer thread drains the queue in FIFO order, so events for a student are applied
+    in the order they were seen, and a failed batch is retried as a whole before anything newer.
+    Only transient errors (lost connection, lock timeout) are retried. A batch that fails for any
+    other reason is split in halves instead, so one bad event is dropped on its own rather than
+    blocking every write behind it.
+    """
+    def __init__(self, db_manager, batch_size=100, flush_interval=0.2, retry_delay=0.5, max_retry_delay=30.0, on_result=None, metrics=None):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.on_result = on_result
+        self.metrics = metrics
+        self.events = queue.Queue()
+        self.is_running = False
+        self.thread = None
+        self.stats = {'submitted': 0, 'committed': 0, 'batches': 0, 'retries': 0, 'dropped': 0}
+        self.stats_lock = threading.Lock() # submit() is called from every camera and recognition worker
+
+    def start(self):
+        if self.is_running: return
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, student_id, mode, timestamp=None):
+        """Queues an entry/exit event; the timestamp is taken now, not when it is written."""
+        self.events.put((student_id, mode, timestamp or datetime.now()))
+        self._count('submitted')
+
+    def _count(self, name, n=1):
+        with self.stats_lock: self.stats[name] += n
+
+    def pending(self):
+        return self.events.qsize()
+
+    def stop(self, timeout=10.0):
+        """Stops the writer after flushing everything already submitted."""
+        self.is_running = False
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _next_batch(self):
+        try:
+            batch = [self.events.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            try: batch.append(self.events.get(timeout=remaining))
+            except queue.Empty: break
+        return batch
+
+    def _write(self, batch):
+        """Writes a batch, retrying transient errors; returns (event, info) pairs in order."""
+        delay = self.retry_delay
+        while True:
+            try:
+                started = time.perf_counter()
+                infos = self.db_manager.write_attendance_batch(batch)
+                if self.metrics: self.metrics.record('db_write', time.perf_counter() - started)
+                self._count('batches')
+                self._count('committed', sum(1 for info in infos if info is not None))
+                return list(zip(batch, infos))
+            except Exception as err:
+                if self.db_manager.is_transient(err):
+                    self._count('retries')
+                    if self.metrics: self.metrics.count('db_retries')
+                    print(f"Attendance write failed ({len(batch)} events), retrying in {delay:.1f}s: {err}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+                    continue
+                # Retrying cannot help; narrow it down to the offending event and drop that one.
+                if len(batch) > 1:
+                    half = len(batch) // 2
+                    return self._write(batch[:half]) + self._write(batch[half:])
+                student_id, mode, _ = batch[0]
+                print(f"Dropping attendance {mode} for {student_id}: {err}")
+                self._count('dropped')
+                if self.metrics: self.metrics.count('db_dropped')
+                self.db_manager.attendance_state.forget([student_id])
+                return [(batch[0], None)]
+
+    def _run(self):
+        while self.is_running or not self.events.empty():
+            batch = self._next_batch()
+            if not batch: continue
+            results = self._write(batch)
+            if self.on_result:
+                for (student_id, mode, _), info in results:
+                    self.on_result(student_id, mode, info)
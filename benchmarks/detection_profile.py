@@ -0,0 +1,118 @@
+"""
+Accuracy/latency profile of the detection pipeline settings ([pipeline] in config.ini).
+
+Run from the repository root:
+    python -m benchmarks.detection_profile --photos Images --scales 0.25 0.5 --upsample 0 1 2
+
+Every labelled photo in --photos (named <student_id>.jpg or <student_id>_<anything>.jpg) is
+shrunk by each --distances factor and placed in a 640x480 frame, standing in for the same
+person further from the camera. For each combination of detection scale, model, upsample
+count and num_jitters the profile reports how many faces were detected and correctly
+identified, and the per-frame detection and per-face encoding latency. Encoding from a crop
+of the full frame (the pipeline) is compared with encoding on the small detection frame.
+The gallery is each student's first photo, encoded at full resolution.
+Without --photos, synthetic frames are used and only latency is meaningful.
+"""
+import argparse
+import itertools
+import os
+import time
+import cv2
+import face_recognition
+import numpy as np
+from benchmarks.synthetic import synthetic_frame
+from face_detector import FaceDetector
+from face_matcher import BruteForceMatcher
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+FRAME_WIDTH, FRAME_HEIGHT = 640, 480
+
+def load_photos(folder):
+    """[(student_id, image)] sorted by file name."""
+    photos = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS): continue
+        img = cv2.imread(os.path.join(folder, name))
+        if img is not None: photos.append((os.path.splitext(name)[0].split('_')[0], img))
+    return photos
+
+def place(img, distance):
+    """The photo shrunk by `distance` and centred in a camera-sized frame."""
+    frame = np.full((FRAME_HEIGHT, FRAME_WIDTH, 3), 90, np.uint8)
+    fit = min(FRAME_WIDTH / img.shape[1], FRAME_HEIGHT / img.shape[0]) * distance
+    small = cv2.resize(img, (max(1, int(img.shape[1] * fit)), max(1, int(img.shape[0] * fit))))
+    y, x = (FRAME_HEIGHT - small.shape[0]) // 2, (FRAME_WIDTH - small.shape[1]) // 2
+    frame[y:y + small.shape[0], x:x + small.shape[1]] = small
+    return frame
+
+def build_gallery(photos, encoding_model):
+    gallery, ids = [], []
+    for student_id, img in photos:
+        if student_id in ids: continue
+        encodings = face_recognition.face_encodings(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), model=encoding_model)
+        if encodings: gallery.append(encodings[0]); ids.append(student_id)
+    return np.asarray(gallery, np.float32).reshape(-1, 128), ids
+
+def encode_small(detector, img, img_small, boxes):
+    """The previous single-resolution path: encode on the detection frame itself."""
+    rgb = cv2.cvtColor(img_small, cv2.COLOR_BGR2RGB)
+    small_boxes = [tuple(int(v * detector.scale) for v in box) for box in boxes]
+    return face_recognition.face_encodings(rgb, small_boxes, num_jitters=detector.num_jitters, model=detector.encoding_model)
+
+def profile(detector, encode, frames, matcher):
+    detected = identified = 0
+    detect_s, encode_s = [], []
+    for student_id, frame in frames:
+        start = time.perf_counter()
+        small = detector.downscale(frame)
+        boxes = detector.detect(frame, small)
+        detect_s.append(time.perf_counter() - start)
+        if not boxes: continue
+        detected += 1
+        start = time.perf_counter()
+        encodings = encode(detector, frame, small, boxes)
+        encode_s.append((time.perf_counter() - start) / len(boxes))
+        if matcher and student_id in {sid for _, sid, _ in matcher.match(encodings)}: identified += 1
+    return {'detected': detected / len(frames) * 100, 'identified': identified / len(frames) * 100 if matcher else None,
+            'detect_ms': float(np.median(detect_s)) * 1000,
+            'encode_ms': float(np.median(encode_s)) * 1000 if encode_s else None}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--photos', help="folder of labelled face photos (default: synthetic frames)")
+    parser.add_argument('--distances', type=float, nargs='+', default=[1.0, 0.5, 0.25], help="photo size relative to the frame")
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.25, 0.5])
+    parser.add_argument('--models', nargs='+', choices=('hog', 'cnn'), default=['hog'])
+    parser.add_argument('--upsample', type=int, nargs='+', default=[1])
+    parser.add_argument('--jitters', type=int, nargs='+', default=[1])
+    parser.add_argument('--encoding-model', choices=('small', 'large'), default='small')
+    parser.add_argument('--frames', type=int, default=20, help="synthetic frames when --photos is not given")
+    args = parser.parse_args()
+
+    if args.photos:
+        photos = load_photos(args.photos)
+        gallery, ids = build_gallery(photos, args.encoding_model)
+        matcher = BruteForceMatcher(gallery, ids) if ids else None
+    else:
+        photos, matcher = [(None, synthetic_frame(faces=1, seed=i)) for i in range(args.frames)], None
+    if not photos:
+        print(f"No photos found in {args.photos}.")
+        return
+
+    encoders = {'crop': lambda d, img, img_small, boxes: d.encode(img, boxes), 'small': encode_small}
+    print(f"{'distance':>8} {'scale':>6} {'model':>5} {'up':>3} {'jit':>3} {'encode':>6} "
+          f"{'detected':>9} {'identified':>11} {'detect ms':>10} {'encode ms':>10}")
+    for distance in args.distances:
+        frames = [(student_id, place(img, distance)) for student_id, img in photos]
+        for scale, model, upsample, jitters in itertools.product(args.scales, args.models, args.upsample, args.jitters):
+            detector = FaceDetector(scale=scale, model=model, upsample=upsample, num_jitters=jitters,
+                                    encoding_model=args.encoding_model)
+            for label, encode in encoders.items():
+                r = profile(detector, encode, frames, matcher)
+                identified = f"{r['identified']:.0f}%" if r['identified'] is not None else "n/a"
+                encode_ms = f"{r['encode_ms']:.1f}" if r['encode_ms'] is not None else "-"
+                print(f"{distance:>8.2f} {scale:>6.2f} {model:>5} {upsample:>3} {jitters:>3} {label:>6} "
+                      f"{r['detected']:>8.0f}% {identified:>11} {r['detect_ms']:>10.1f} {encode_ms:>10}")
+
+if __name__ == "__main__":
+    main()
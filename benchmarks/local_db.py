@@ -0,0 +1,21 @@
+"""
+Embedded database for the benchmarks, so they run without a MySQL server.
+
+local_database() returns a real DatabaseManager on the SQLite backend, configured through a
+config file written next to the database. Timings are for comparing commits against each
+other, not for predicting absolute MySQL latency.
+"""
+import configparser
+from database_manager import DatabaseManager
+
+def local_database(path, settings=None):
+    """
+    DatabaseManager backed by a SQLite file at `path`. `settings` maps config.ini sections to
+    option dicts, e.g. {'attendance': {'cooldown_minutes': '0'}}.
+    """
+    config = configparser.ConfigParser()
+    config.read_dict({'database': {'backend': 'sqlite', 'path': path}, **(settings or {})})
+    config_file = path + '.ini'
+    with open(config_file, 'w') as f:
+        config.write(f)
+    return DatabaseManager(config_file)
@@ -0,0 +1,99 @@
+"""
+CPU use and wake-up latency of the motion gate in front of face detection.
+
+Run from the repository root:
+    python -m benchmarks.motion_benchmark --photo Images/1001.jpg --idle-seconds 30 --active-seconds 5 --fps 15
+
+A synthetic camera feed (an empty doorway with sensor noise, then someone walking in) is fed
+through RecognitionEngine.recognize with the [motion] gate on and off. The person is the --photo
+face photo; without one a plain skin-toned shape stands in, which moves the gate but is never
+detected as a face. Frames are stamped on a simulated clock but processed as fast as possible,
+so CPU use is reported as the share of one core the feed would need in real time.
+Gate wake-up is the simulated time from the first frame showing the person to the first frame
+the gate lets through to detection; that frame's detection time is reported separately, and
+"found" is the time until detection first returns the face.
+"""
+import argparse
+import time
+import cv2
+import numpy as np
+from batch_processor import BatchStream
+from attendance_system import RecognitionEngine
+from benchmarks.synthetic import synthetic_frame
+from motion_gate import MotionGate
+
+FACE_HEIGHT = 200
+
+def feed(idle_frames, active_frames, photo=None, seed=0):
+    """Yields (has_face, frame): the empty scene, then the photo (or a stand-in) crossing it from the left."""
+    rng = np.random.default_rng(seed)
+    background = synthetic_frame(faces=0, seed=seed)
+    # A few pre-computed noisy copies stand in for sensor noise without costing CPU per frame.
+    noisy = [np.clip(background + rng.normal(0, 2, background.shape), 0, 255).astype(np.uint8) for _ in range(8)]
+    if photo is not None:
+        fit = min(FACE_HEIGHT / photo.shape[0], background.shape[1] / 2 / photo.shape[1])
+        photo = cv2.resize(photo, (max(1, int(photo.shape[1] * fit)), max(1, int(photo.shape[0] * fit))))
+    for i in range(idle_frames): yield False, noisy[i % len(noisy)]
+    for i in range(active_frames):
+        # Enters at the left edge and walks to the middle over the first half, then stands still.
+        progress = min(1.0, i / max(1, active_frames // 2))
+        frame = noisy[i % len(noisy)].copy()
+        if photo is None:
+            cv2.ellipse(frame, (int(320 * progress), 240), (45, 60), 0, 0, 360, (140, 170, 210), cv2.FILLED)
+        else:
+            x = int((frame.shape[1] - photo.shape[1]) // 2 * progress)
+            y = (frame.shape[0] - photo.shape[0]) // 2
+            frame[y:y + photo.shape[0], x:x + photo.shape[1]] = photo
+        yield True, frame
+
+def run(engine, gate, args, photo=None):
+    stream = BatchStream(engine)
+    stream.motion_gate = gate
+    idle_frames, active_frames = int(args.idle_seconds * args.fps), int(args.active_seconds * args.fps)
+    cpu = {False: 0.0, True: 0.0}
+    appeared = opened = found = detect_ms = None
+    for number, (has_face, frame) in enumerate(feed(idle_frames, active_frames, photo)):
+        now = number / args.fps
+        if has_face and appeared is None: appeared = now
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        faces = engine.recognize(stream, frame, now=now)
+        elapsed = time.perf_counter() - wall_start
+        cpu[has_face] += time.process_time() - cpu_start
+        if not has_face: continue
+        # The gate let this frame through if it examined it and is now awake (motion or a face).
+        detected = gate is None or (gate.last_check == now and gate.is_awake(now))
+        if detected and opened is None: opened, detect_ms = now, elapsed * 1000
+        if faces and found is None: found = now + elapsed
+    return {'idle_cpu': cpu[False] / max(args.idle_seconds, 1e-9) * 100,
+            'active_cpu': cpu[True] / max(args.active_seconds, 1e-9) * 100,
+            'wake_ms': (opened - appeared) * 1000 if opened is not None else None,
+            'detect_ms': detect_ms,
+            'found_ms': (found - appeared) * 1000 if found is not None else None}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='config.ini', help="[motion] and [pipeline] settings")
+    parser.add_argument('--photo', help="face photo of the person walking in (default: an undetectable stand-in)")
+    parser.add_argument('--fps', type=float, default=15.0, help="simulated camera frame rate")
+    parser.add_argument('--idle-seconds', type=float, default=30.0)
+    parser.add_argument('--active-seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    photo = None
+    if args.photo:
+        photo = cv2.imread(args.photo)
+        if photo is None:
+            print(f"Could not read {args.photo}.")
+            return
+    engine = RecognitionEngine(args.config, use_database=False)
+    print(f"{'gate':<6} {'idle cpu':>9} {'active cpu':>11} {'wake':>8} {'detect':>8} {'found':>8}")
+    for label in ('off', 'on'):
+        gate = (engine.create_motion_gate() or MotionGate()) if label == 'on' else None
+        r = run(engine, gate, args, photo)
+        wake = f"{r['wake_ms']:.0f}ms" if r['wake_ms'] is not None else "missed"
+        detect = f"{r['detect_ms']:.0f}ms" if r['detect_ms'] is not None else "-"
+        found = f"{r['found_ms']:.0f}ms" if r['found_ms'] is not None else ("missed" if photo is not None else "-")
+        print(f"{label:<6} {r['idle_cpu']:>8.1f}% {r['active_cpu']:>10.1f}% {wake:>8} {detect:>8} {found:>8}")
+
+if __name__ == "__main__":
+    main()
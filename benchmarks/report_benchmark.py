@@ -0,0 +1,75 @@
+"""
+Report latency against a large attendance history: the daily report with and without the
+schema indexes, and the date-range reports served from the daily rollups.
+
+Run from the repository root:
+    python -m benchmarks.report_benchmark --rows 1000000 --students 5000 --max-ms 100
+
+The history is generated into a temporary SQLite database (the sqlite backend). The report
+is timed on the migrated schema, then again after dropping the migration's indexes to show
+what they buy. Exits non-zero if the indexed p95 exceeds --max-ms, so it can gate a change.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from benchmarks.local_db import local_database
+from benchmarks.suite import measure, print_results, summarize
+from benchmarks.synthetic import populate
+
+INDEXES = ('idx_logs_student_date', 'idx_logs_date', 'idx_students_name', 'idx_students_id_search')
+
+def time_reports(db_manager, report_date, repeat, label, params):
+    results = []
+    for search, term in (('all', ''), ('search', 'Student 00012')):
+        durations = measure(lambda: db_manager.get_daily_report(report_date, term), repeat)
+        results.append(summarize('db.get_daily_report', dict(params, filter=search, schema=label), durations))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help="approximate attendance_logs rows")
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-ms', type=float, default=100.0, help="p95 bound for the indexed report")
+    parser.add_argument('--skip-unindexed', action='store_true')
+    args = parser.parse_args()
+
+    attendance_rate = 0.85
+    days = max(1, round(args.rows / (args.students * attendance_rate)))
+    params = {'students': args.students, 'rows': args.rows}
+    report_date = (date.today() - timedelta(days=days // 2)).strftime('%Y-%m-%d')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = local_database(os.path.join(tmp, 'report.db'))
+        print(f"Generating {days} days of history for {args.students} students...")
+        populate(db_manager, students=args.students, days=days, attendance_rate=attendance_rate)
+        results = time_reports(db_manager, report_date, args.repeat, 'indexed', params)
+        # Range reports come from the daily rollups, so their cost does not grow with the range.
+        end_date = date.today()
+        for range_days in (7, 120):
+            start_date = end_date - timedelta(days=range_days)
+            range_params = dict(params, days=range_days, schema='indexed')
+            results.append(summarize('db.get_range_report', range_params,
+                                     measure(lambda: db_manager.get_range_report(start_date, end_date), args.repeat)))
+            results.append(summarize('db.get_section_report', range_params,
+                                     measure(lambda: db_manager.get_section_report(start_date, end_date), args.repeat)))
+
+        if not args.skip_unindexed:
+            with db_manager._connection() as conn:
+                cursor = conn.cursor()
+                for index in INDEXES: cursor.execute(f"DROP INDEX {index}")
+                conn.commit()
+                cursor.close()
+            results += time_reports(db_manager, report_date, max(3, args.repeat // 5), 'unindexed', params)
+        db_manager.pool.close_all()
+
+    print_results(results)
+    worst = max(r['p95_ms'] for r in results if r['params']['schema'] == 'indexed')
+    if worst > args.max_ms:
+        print(f"Indexed report p95 {worst:.1f}ms exceeds the {args.max_ms:.0f}ms bound.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
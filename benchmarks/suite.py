@@ -0,0 +1,179 @@
+"""
+Reproducible benchmark suite for the hot paths: encoding, detection, matching and the database.
+
+Run from the repository root:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --only match db --compare results.json
+
+Every input is synthetic and seeded, and the database benchmarks run on the embedded SQLite
+backend (benchmarks/local_db.py), so no camera, photos or MySQL server are needed.
+Results are written as JSON (one record per benchmark and parameter set) so two commits can
+be compared with --compare.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import numpy as np
+from datetime import date, datetime, timedelta
+from benchmarks.local_db import local_database
+from benchmarks.synthetic import populate, synthetic_frame, synthetic_gallery, synthetic_queries, write_photos
+from face_matcher import BruteForceMatcher
+
+BENCHMARKS = ('encode', 'detect', 'match', 'db')
+
+def measure(fn, repeat, warmup=1):
+    """Calls fn() warmup + repeat times and returns the timed durations in seconds."""
+    for _ in range(warmup): fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def summarize(name, params, durations, items=1):
+    """One result record; `items` is how many operations each timed call covers (e.g. faces per frame)."""
+    ms = np.asarray(durations) * 1000 / items
+    total = float(np.sum(durations))
+    return {'name': name, 'params': params, 'samples': len(durations),
+            'mean_ms': float(ms.mean()), 'p50_ms': float(np.percentile(ms, 50)),
+            'p95_ms': float(np.percentile(ms, 95)), 'p99_ms': float(np.percentile(ms, 99)),
+            'ops_per_s': len(durations) * items / total if total else 0.0}
+
+def bench_encode(args, tmp):
+    """generate_encodings over a folder of synthetic photos: a cold run, then a fully cached run."""
+    # Imported here so the other benchmarks run on machines without dlib.
+    from face_encoder import generate_encodings
+    results = []
+    folder, cache_file = os.path.join(tmp, 'Images'), os.path.join(tmp, 'EncodeCache.p')
+    write_photos(folder, args.photos)
+    cwd = os.getcwd()
+    os.chdir(tmp) # generate_encodings writes the store into the working directory
+    try:
+        for label in ('cold', 'cached'):
+            start = time.perf_counter()
+            generate_encodings(folder, os.path.join(tmp, 'FailedImages'), cache_file=cache_file, workers=args.workers)
+            results.append(summarize('encode', {'photos': args.photos, 'cache': label, 'workers': args.workers},
+                                     [time.perf_counter() - start], items=args.photos))
+    finally:
+        os.chdir(cwd)
+    return results
+
+def bench_detect(args, tmp):
+    """FaceDetector.detect on the small frame and encode on full-resolution crops, as the pipeline runs them."""
+    from face_detector import FaceDetector
+    detector = FaceDetector(scale=args.scale)
+    frames = [synthetic_frame(faces=2, seed=i) for i in range(args.frames)]
+    smalls = [detector.downscale(frame) for frame in frames]
+    boxes = [detector.detect(frame, small) for frame, small in zip(frames, smalls)]
+    turns = itertools.cycle(range(len(frames)))
+    def locate():
+        i = next(turns)
+        detector.detect(frames[i], detector.downscale(frames[i]))
+    def encode():
+        i = next(turns)
+        detector.encode(frames[i], boxes[i] or [(40, 240, 240, 40)])
+    params = {'scale': args.scale, 'frames': args.frames}
+    return [summarize('detect.face_locations', params, measure(locate, args.repeat)),
+            summarize('detect.face_encodings', params, measure(encode, args.repeat))]
+
+def bench_match(args, tmp):
+    """Matcher.match on one frame's worth of faces against galleries of each size."""
+    results = []
+    for size in args.sizes:
+        gallery = synthetic_gallery(size)
+        matcher = BruteForceMatcher(gallery, [str(i) for i in range(size)])
+        queries, _ = synthetic_queries(gallery, args.repeat * args.faces_per_frame)
+        frames = itertools.cycle(queries.reshape(args.repeat, args.faces_per_frame, -1))
+        durations = measure(lambda: matcher.match(next(frames)), args.repeat)
+        results.append(summarize('match.brute', {'gallery': size, 'faces_per_frame': args.faces_per_frame},
+                                 durations, items=args.faces_per_frame))
+    return results
+
+def bench_db(args, tmp):
+    """log_attendance and get_daily_report against a populated roster and log history."""
+    db_manager = local_database(os.path.join(tmp, 'bench.db'), {'attendance': {'cooldown_minutes': '0'}})
+    student_ids = populate(db_manager, students=args.students, days=args.days)
+    params = {'students': args.students, 'days': args.days}
+    rng = np.random.default_rng(2)
+
+    picks = iter(rng.choice(student_ids, size=2 * args.repeat + 2).tolist())
+    entered = []
+    def entry():
+        entered.append(next(picks))
+        db_manager.log_attendance(entered[-1], 'entry')
+    def leave():
+        db_manager.log_attendance(entered.pop(), 'exit')
+    results = [summarize('db.log_attendance', dict(params, mode='entry'), measure(entry, args.repeat)),
+               summarize('db.log_attendance', dict(params, mode='exit'), measure(leave, args.repeat - 1))]
+
+    report_date = (date.today() - timedelta(days=1)).strftime('%Y-%m-%d')
+    report_repeat = max(3, args.repeat // 20)
+    for label, term in (('all', ''), ('search', 'Student 0001')):
+        durations = measure(lambda: db_manager.get_daily_report(report_date, term), report_repeat)
+        results.append(summarize('db.get_daily_report', dict(params, filter=label), durations))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def result_key(result):
+    return result['name'] + ' ' + ' '.join(f"{k}={v}" for k, v in sorted(result['params'].items()))
+
+def print_results(results, baseline=None):
+    previous = {result_key(r): r for r in (baseline or [])}
+    width = max([len(result_key(r)) for r in results] + [9])
+    print(f"{'benchmark':<{width}} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}" + (f" {'p50 vs base':>12}" if baseline else ""))
+    for result in results:
+        line = f"{result_key(result):<{width}} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['ops_per_s']:>10.1f}"
+        old = previous.get(result_key(result))
+        if old and old['p50_ms']: line += f" {result['p50_ms'] / old['p50_ms']:>11.2f}x"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="gallery sizes for match")
+    parser.add_argument('--faces-per-frame', type=int, default=4)
+    parser.add_argument('--photos', type=int, default=50, help="synthetic photos for encode")
+    parser.add_argument('--workers', type=int, default=1, help="encoder processes for encode")
+    parser.add_argument('--frames', type=int, default=20, help="distinct synthetic frames for detect")
+    parser.add_argument('--scale', type=float, default=0.25, help="detection scale for detect")
+    parser.add_argument('--students', type=int, default=2000, help="roster size for db")
+    parser.add_argument('--days', type=int, default=60, help="days of log history for db")
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in BENCHMARKS:
+            if name not in args.only: continue
+            print(f"Running {name}...")
+            results.extend(globals()[f'bench_{name}'](args, tmp))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    if args.output:
+        run = {'commit': git_commit(), 'created': datetime.now().isoformat(timespec='seconds'),
+               'python': platform.python_version(), 'machine': platform.platform(), 'processor': platform.processor(),
+               'cpu_count': os.cpu_count(), 'results': results}
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"Results written to {args.output}.")
+
+if __name__ == "__main__":
+    main()
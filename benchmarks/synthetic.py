@@ -0,0 +1,76 @@
+"""Deterministic synthetic inputs for the benchmarks: galleries, frames, photos, rosters and log history."""
+import os
+import cv2
+import numpy as np
+from datetime import date, datetime, timedelta
+
+MAJORS = ['Computer Science', 'Electrical', 'Mechanical', 'Civil', 'Mathematics', 'Physics']
+SECTIONS = ['A', 'B', 'C', 'D']
+
+def synthetic_gallery(size, dim=128, n_clusters=200, spread=0.12, seed=0):
+    """
+    Real face encodings cluster by appearance, so the gallery is drawn from a Gaussian mixture
+    rather than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 0.3, (n_clusters, dim))
+    labels = rng.integers(0, n_clusters, size)
+    return (centers[labels] + rng.normal(0, spread, (size, dim))).astype(np.float32)
+
+def synthetic_queries(gallery, count, noise=0.02, seed=1):
+    """Gallery rows plus small perturbations, like a second photo of an enrolled student. Returns (queries, rows)."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(gallery), count)
+    return gallery[picks] + rng.normal(0, noise, (count, gallery.shape[1])).astype(np.float32), picks
+
+def synthetic_frame(width=640, height=480, faces=1, seed=0):
+    """A textured BGR camera frame with `faces` skin-toned ellipses standing in for people."""
+    rng = np.random.default_rng(seed)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    for _ in range(faces):
+        cx, cy = int(rng.integers(80, width - 80)), int(rng.integers(80, height - 80))
+        cv2.ellipse(frame, (cx, cy), (45, 60), 0, 0, 360, (140, 170, 210), cv2.FILLED)
+        cv2.circle(frame, (cx - 18, cy - 15), 6, (40, 40, 40), cv2.FILLED)
+        cv2.circle(frame, (cx + 18, cy - 15), 6, (40, 40, 40), cv2.FILLED)
+        cv2.ellipse(frame, (cx, cy + 25), (20, 8), 0, 0, 180, (60, 60, 120), 3)
+    return frame
+
+def write_photos(folder, count, seed=0):
+    """Writes `count` synthetic enrolment photos named <student_id>.jpg into folder."""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        cv2.imwrite(os.path.join(folder, f"S{i:06d}.jpg"), synthetic_frame(480, 480, faces=1, seed=seed + i))
+
+def populate(db_manager, students=2000, days=30, attendance_rate=0.85, end_date=None, seed=0):
+    """
+    Fills the database with a roster and `days` of attendance history ending at end_date
+    (default today). Rows are bulk-inserted directly, bypassing the per-event path being measured,
+    and the daily rollups are rebuilt from them.
+    Returns the list of student IDs.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or date.today()
+    db_manager.create_tables()
+    student_ids = [f"S{i:06d}" for i in range(students)]
+    with db_manager._connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO students (student_id, name, major, year, section) VALUES (%s, %s, %s, %s, %s)",
+            [(sid, f"Student {i:06d}", MAJORS[i % len(MAJORS)], 1 + i % 4, SECTIONS[i % len(SECTIONS)])
+             for i, sid in enumerate(student_ids)])
+        cursor.executemany("INSERT INTO student_images (student_id, image_path) VALUES (%s, %s)",
+                           [(sid, f"Images/{sid}.jpg") for sid in student_ids])
+        for day in range(days, 0, -1):
+            log_date = end_date - timedelta(days=day)
+            present = [sid for sid, hit in zip(student_ids, rng.random(students) < attendance_rate) if hit]
+            arrivals = rng.integers(0, 3600, len(present))
+            rows = []
+            for sid, offset in zip(present, arrivals):
+                entry = datetime.combine(log_date, datetime.min.time()) + timedelta(hours=8, seconds=int(offset))
+                rows.append((sid, log_date, entry, entry + timedelta(hours=6), 'Present'))
+            cursor.executemany(
+                "INSERT INTO attendance_logs (student_id, date, entry_time, exit_time, status) VALUES (%s, %s, %s, %s, %s)", rows)
+        conn.commit()
+        cursor.close()
+    db_manager.rebuild_summaries()
+    return student_ids
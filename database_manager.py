@@ -1,195 +1,741 @@
-import mysql.connector
-from datetime import datetime
+from datetime import date, datetime
 import configparser
 from datetime import timedelta
+from contextlib import contextmanager
 import os
+import queue
+from collections import OrderedDict
+import threading
+import time
+from db_backends import create_backend
+
+class ConnectionPool:
+    """A fixed-size pool of open connections, created lazily and handed out most-recently-used first."""
+    def __init__(self, connect, size=5, timeout=10.0, errors=(Exception,)):
+        self._connect = connect
+        self.errors = errors
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {'borrows': 0, 'waits': 0, 'timeouts': 0, 'total_wait': 0.0, 'max_wait': 0.0,
+                       'connects': 0, 'total_connect': 0.0, 'max_connect': 0.0, 'in_use': 0, 'peak_in_use': 0}
+
+    def acquire(self):
+        """
+        Returns an open connection, waiting up to `timeout` seconds for one to be released.
+        Only that blocking wait counts as pool wait; opening a new connection is timed as connect.
+        """
+        wait = 0.0
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create: self._created += 1
+            if can_create:
+                start = time.perf_counter()
+                conn = self._connect()
+                if conn is None:
+                    with self._lock: self._created -= 1
+                    return None
+                connect_time = time.perf_counter() - start
+                with self._lock:
+                    stats = self._stats
+                    stats['connects'] += 1
+                    stats['total_connect'] += connect_time
+                    stats['max_connect'] = max(stats['max_connect'], connect_time)
+            else:
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                    wait = time.perf_counter() - start
+                except queue.Empty:
+                    with self._lock: self._stats['timeouts'] += 1
+                    print(f"Error connecting to database: no pooled connection free after {self.timeout}s")
+                    return None
+
+        # A connection can go stale while idle (server restart, wait_timeout); revive it quietly.
+        try:
+            conn.ping(reconnect=True, attempts=1)
+        except self.errors as err:
+            print(f"Error connecting to database: {err}")
+            with self._lock: self._created -= 1
+            return None
+
+        with self._lock:
+            stats = self._stats
+            stats['borrows'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+            if wait > 0: stats['waits'] += 1
+            stats['in_use'] += 1
+            stats['peak_in_use'] = max(stats['peak_in_use'], stats['in_use'])
+        return conn
+
+    def release(self, conn):
+        with self._lock: self._stats['in_use'] -= 1
+        self._idle.put(conn)
+
+    def stats(self):
+        """Snapshot of pool usage: borrow count, wait and connect times (seconds) and connection counts."""
+        with self._lock:
+            stats = dict(self._stats, size=self.size, open=self._created)
+        stats['avg_wait'] = stats['total_wait'] / stats['borrows'] if stats['borrows'] else 0.0
+        stats['avg_connect'] = stats['total_connect'] / stats['connects'] if stats['connects'] else 0.0
+        return stats
+
+    def close_all(self):
+        while True:
+            try: conn = self._idle.get_nowait()
+            except queue.Empty: break
+            conn.close()
+            with self._lock: self._created -= 1
+
+def current_status(last_entry_time, daily_status, day):
+    """
+    daily_status as of `day`. The stored value only describes the day of the last entry, so the
+    status rolls over to 'Absent' at midnight by itself, without rewriting the students table.
+    """
+    return daily_status if last_entry_time and last_entry_time.date() == day else 'Absent'
+
+class AttendanceState:
+    """
+    In-process copy of each student's last_entry_time and daily_status.
+    Attendance decisions (cooldown, exit-without-entry) are made against this table without a
+    database round-trip. Accepted events update it before they are written. Other processes
+    sharing the database (kiosks at other doors) are not seen here, so DatabaseManager confirms
+    the rare rejections against the database before returning them.
+    """
+    DEFAULT_ENTRY_TIME = datetime(2000, 1, 1)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.warmed = False
+
+    def load(self, rows):
+        with self.lock:
+            for row in rows:
+                self.records[row['student_id']] = {'last_entry_time': row['last_entry_time'], 'daily_status': row['daily_status']}
+            self.warmed = True
+
+    def refresh(self, row):
+        """
+        Takes a student's row from the database if it is newer than the in-memory record, i.e.
+        another process logged a later entry. Returns True if the record changed. A row with the
+        same entry time is ignored: this process may have events for it that are not written yet.
+        """
+        with self.lock:
+            record = self.records.get(row['student_id'])
+            if record is not None and row['last_entry_time'] <= record['last_entry_time']: return False
+            self.records[row['student_id']] = {'last_entry_time': row['last_entry_time'], 'daily_status': row['daily_status']}
+            return True
+
+    def decide(self, student_id, mode, event_time, cooldown):
+        """Returns the status for an event and, if it is accepted, applies it to the table."""
+        with self.lock:
+            record = self.records.get(student_id)
+            if record is None: return "Unknown Student"
+            if mode == "entry":
+                # Cooldown: Prevent marking entry again within the configured window
+                if event_time - record['last_entry_time'] < cooldown: return "Cooldown"
+                record['last_entry_time'], record['daily_status'] = event_time, 'Present'
+            elif mode == "exit":
+                if current_status(record['last_entry_time'], record['daily_status'], event_time.date()) != 'Present': return "Not Present"
+                record['daily_status'] = 'Exited'
+            return "Success"
+
+    def add(self, student_id):
+        with self.lock: self.records[student_id] = {'last_entry_time': self.DEFAULT_ENTRY_TIME, 'daily_status': 'Absent'}
+
+    def rename(self, old_id, new_id):
+        with self.lock:
+            if old_id in self.records: self.records[new_id] = self.records.pop(old_id)
+
+    def forget(self, student_ids):
+        with self.lock:
+            for student_id in student_ids: self.records.pop(student_id, None)
+
+class StudentCache:
+    """Keyed LRU cache of student records with a time-to-live, plus hit/miss counters for sizing."""
+    def __init__(self, max_size=2048, ttl=300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, student_id, count=True):
+        """
+        Returns a copy of the cached record, or None on a miss or expired entry. Internal re-reads
+        pass count=False so that only real lookups move the hit/miss counters.
+        """
+        with self.lock:
+            entry = self.entries.get(student_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None: del self.entries[student_id]
+                if count: self.counters['misses'] += 1
+                return None
+            self.entries.move_to_end(student_id)
+            if count: self.counters['hits'] += 1
+            return dict(entry[1])
+
+    def put(self, record):
+        with self.lock:
+            self.entries[record['student_id']] = (time.monotonic() + self.ttl, dict(record))
+            self.entries.move_to_end(record['student_id'])
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def update(self, student_id, increments=None, **fields):
+        """
+        Applies a write to a cached record in place: `fields` are set and `increments` added to
+        numeric fields, under the lock. Returns the new copy, or None if the student is not cached.
+        Does not count as a lookup.
+        """
+        with self.lock:
+            entry = self.entries.get(student_id)
+            if entry is None: return None
+            for name, n in (increments or {}).items(): entry[1][name] = (entry[1].get(name) or 0) + n
+            entry[1].update(fields)
+            return dict(entry[1])
+
+    def invalidate(self, *student_ids):
+        with self.lock:
+            for student_id in student_ids:
+                if self.entries.pop(student_id, None) is not None: self.counters['invalidations'] += 1
+
+    def clear(self):
+        with self.lock: self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters, size=len(self.entries), max_size=self.max_size)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+# Attendance state and the student cache are kept once per database and shared by every
+# DatabaseManager in the process, so edits made from the GUI are seen by the camera loop.
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+def _shared(key, factory):
+    with _shared_caches_lock:
+        if key not in _shared_caches: _shared_caches[key] = factory()
+        return _shared_caches[key]
 
 class DatabaseManager:
-    """Handles all interactions with the MySQL database."""
+    """
+    Handles all interactions with the database: a MySQL server or an embedded SQLite file,
+    chosen by `backend` in the [database] section.
+    """
     def __init__(self, config_file='config.ini'):
         config = configparser.ConfigParser()
         config.read(config_file)
         self.db_config = config['database']
-        self.connection = None
+        self.backend = create_backend(self.db_config)
+        self.errors = self.backend.errors
+        self.pool = ConnectionPool(self._open_connection,
+                                   size=config.getint('pool', 'size', fallback=5),
+                                   timeout=config.getfloat('pool', 'timeout', fallback=10.0),
+                                   errors=self.errors)
+        self._local = threading.local()
+        self.cooldown = timedelta(minutes=config.getfloat('attendance', 'cooldown_minutes', fallback=30))
+        db_key = self.backend.key
+        self.attendance_state = _shared(db_key + ('attendance',), AttendanceState)
+        self.student_cache = _shared(db_key + ('students',), lambda: StudentCache(
+            max_size=config.getint('cache', 'student_cache_size', fallback=2048),
+            ttl=config.getfloat('cache', 'student_cache_ttl', fallback=300)))
 
-    def _connect(self):
-        """Establishes a connection to the database."""
+    def _open_connection(self):
+        """Opens a new connection to the database."""
         try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            return self.connection
-        except mysql.connector.Error as err:
+            return self.backend.connect()
+        except self.errors as err:
             print(f"Error connecting to database: {err}")
             return None
 
-    def _disconnect(self):
-        """Closes the database connection."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+    @contextmanager
+    def _connection(self):
+        """
+        Borrows a pooled connection for one logical operation. Nested calls on the same thread
+        (e.g. log_attendance -> get_student_info) share the connection already borrowed.
+        Yields None if no connection could be obtained.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self.pool.acquire()
+        if conn is None:
+            yield None
+            return
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            # Never hand the next borrower an open transaction (or its stale snapshot).
+            try:
+                if conn.in_transaction: conn.rollback()
+            except self.errors:
+                pass
+            self.pool.release(conn)
+
+    def is_transient(self, err):
+        """Whether a failed write should be retried as is (no connection, server gone, lock timeout)."""
+        return isinstance(err, ConnectionError) or self.backend.is_transient(err)
+
+    def pool_stats(self):
+        """Connection pool usage, for sizing [pool] size in config.ini."""
+        return self.pool.stats()
+
+    def cache_stats(self):
+        """Student cache hit/miss counters, for sizing [cache] in config.ini."""
+        return self.student_cache.stats()
 
     def create_tables(self):
         """Creates the necessary tables if they don't exist."""
-        conn = self._connect()
-        if not conn: return
-        cursor = conn.cursor()
-        print("Ensuring database tables exist...")
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS students (
-            student_id VARCHAR(50) PRIMARY KEY,
-            name VARCHAR(100) NOT NULL,
-            major VARCHAR(100),
-            section VARCHAR(10),
-            year INT,
-            total_present INT DEFAULT 0,
-            last_entry_time DATETIME DEFAULT '2000-01-01 00:00:00',
-            daily_status VARCHAR(20) DEFAULT 'Absent'
-        )
-        """)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS student_images (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            student_id VARCHAR(50) NOT NULL,
-            image_path VARCHAR(255) NOT NULL,
-            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
-        )
-        """)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS attendance_logs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
+        with self._connection() as conn:
+            if not conn: return
+            cursor = conn.cursor()
+            print("Ensuring database tables exist...")
+            auto_id = self.backend.auto_id
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS students (
+                student_id VARCHAR(50) PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                major VARCHAR(100),
+                section VARCHAR(10),
+                year INT,
+                total_present INT DEFAULT 0,
+                last_entry_time DATETIME DEFAULT '2000-01-01 00:00:00',
+                daily_status VARCHAR(20) DEFAULT 'Absent'
+            )
+            """)
+            cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS student_images (
+                id {auto_id},
+                student_id VARCHAR(50) NOT NULL,
+                image_path VARCHAR(255) NOT NULL,
+                FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+            )
+            """)
+            cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS attendance_logs (
+                id {auto_id},
+                student_id VARCHAR(50) NOT NULL,
+                date DATE,
+                entry_time DATETIME,
+                exit_time DATETIME,
+                status VARCHAR(20),
+                FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+            )
+            """)
+            cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INT NOT NULL)")
+            conn.commit()
+            self._migrate(conn, cursor)
+            cursor.close()
+
+    # Recomputes both rollups from attendance_logs (run once by the migrations, and by rebuild_summaries).
+    SUMMARY_REBUILD = [
+        """INSERT INTO daily_summary (student_id, date, section, entries, first_entry, last_exit, days_to_date)
+        SELECT student_id, date, section, entries, first_entry, last_exit,
+               ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY date)
+        FROM (SELECT l.student_id, l.date, COALESCE(s.section, '') AS section, COUNT(*) AS entries,
+                     MIN(l.entry_time) AS first_entry, MAX(l.exit_time) AS last_exit
+              FROM attendance_logs l JOIN students s ON s.student_id = l.student_id
+              WHERE l.date IS NOT NULL
+              GROUP BY l.student_id, l.date, s.section) per_day""",
+        """INSERT INTO section_daily_summary (date, section, present, entries)
+        SELECT date, section, COUNT(*), SUM(entries) FROM daily_summary GROUP BY date, section""",
+    ]
+
+    # Schema changes applied in order on top of the tables above; schema_version records how
+    # many have run. Append new entries, never edit or reorder existing ones.
+    # {nocase} makes SQLite build the index case-insensitively so LIKE 'prefix%' can use it;
+    # MySQL's default collation already is.
+    MIGRATIONS = [
+        # Report LEFT JOIN and the exit-time lookup: one student's logs for one day, newest id last.
+        "CREATE INDEX idx_logs_student_date ON attendance_logs (student_id, date, id)",
+        # Everything-on-a-date scans (reports by day, exports).
+        "CREATE INDEX idx_logs_date ON attendance_logs (date)",
+        # Prefix search on name and ID, and ORDER BY name.
+        "CREATE INDEX idx_students_name ON students (name{nocase})",
+        "CREATE INDEX idx_students_id_search ON students (student_id{nocase})",
+        # Daily rollups kept up to date by write_attendance_batch. daily_summary has one row per
+        # student per day attended; days_to_date counts that student's attended days up to and
+        # including `date`, so days attended in any range is a difference of two index lookups.
+        """CREATE TABLE daily_summary (
             student_id VARCHAR(50) NOT NULL,
-            date DATE,
-            entry_time DATETIME,
-            exit_time DATETIME,
-            status VARCHAR(20),
+            date DATE NOT NULL,
+            section VARCHAR(10) NOT NULL DEFAULT '',
+            entries INT NOT NULL DEFAULT 0,
+            first_entry DATETIME,
+            last_exit DATETIME,
+            days_to_date INT NOT NULL,
+            PRIMARY KEY (student_id, date),
             FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
-        )
-        """)
-        conn.commit()
-        cursor.close()
-        self._disconnect()
+        )""",
+        "CREATE INDEX idx_summary_date ON daily_summary (date)",
+        # Students present and entries per section per day, for section and whole-school ranges.
+        """CREATE TABLE section_daily_summary (
+            date DATE NOT NULL,
+            section VARCHAR(10) NOT NULL,
+            present INT NOT NULL DEFAULT 0,
+            entries INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, section)
+        )""",
+    ] + SUMMARY_REBUILD + [
+        # Keyset pagination of the roster: ORDER BY name, student_id from an index, no sort.
+        "CREATE INDEX idx_students_roster ON students (name, student_id)",
+    ]
+
+    def _migrate(self, conn, cursor):
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        current = cursor.fetchone()[0] or 0
+        for version, statement in enumerate(self.MIGRATIONS[current:], current + 1):
+            print(f"Applying schema migration {version}...")
+            cursor.execute(statement.format(nocase=self.backend.nocase))
+            cursor.execute("INSERT INTO schema_version (version) VALUES (%s)", (version,))
+            conn.commit()
 
     def get_all_students(self):
         """Fetches all students and their primary image path."""
-        conn = self._connect()
-        if not conn: return []
-        cursor = conn.cursor(dictionary=True)
-        # This query joins the students and images tables to get all necessary info
-        query = """
-        SELECT 
-            s.student_id, 
-            ANY_VALUE(s.name) as name, 
-            ANY_VALUE(s.major) as major, 
-            ANY_VALUE(s.year) as year, 
-            ANY_VALUE(s.section) as section, 
-            ANY_VALUE(i.image_path) as image_path 
-        FROM students s 
-        LEFT JOIN student_images i ON s.student_id = i.student_id
-        GROUP BY s.student_id
-        ORDER BY ANY_VALUE(s.name)
+        with self._connection() as conn:
+            if not conn: return []
+            cursor = conn.cursor(dictionary=True)
+            # One image path per student through a correlated subquery, which both backends support
+            # (unlike MySQL's ANY_VALUE over a GROUP BY join).
+            query = """
+            SELECT
+                s.student_id,
+                s.name,
+                s.major,
+                s.year,
+                s.section,
+                (SELECT i.image_path FROM student_images i WHERE i.student_id = s.student_id LIMIT 1) AS image_path
+            FROM students s
+            ORDER BY s.name
+            """
+            cursor.execute(query)
+            students = cursor.fetchall()
+            cursor.close()
+            return students
+
+    ROSTER_QUERY = """
+        SELECT s.student_id, s.name, s.major, s.year, s.section,
+               (SELECT i.image_path FROM student_images i WHERE i.student_id = s.student_id LIMIT 1) AS image_path
+        FROM students s
+        {where}
+        ORDER BY s.name {direction}, s.student_id {direction}
+        LIMIT %s
+    """
+
+    def get_students_page(self, limit=50, after=None, before=None, start=None):
         """
-        cursor.execute(query)
-        students = cursor.fetchall()
-        cursor.close()
-        self._disconnect()
-        return students
+        One page of the roster in (name, student_id) order using keyset pagination. `after` or
+        `before` is the (name, student_id) of the row the page continues from, and `start` the key
+        of its first row (to re-read a page), so every page costs one index range scan instead
+        of skipping OFFSET rows.
+        """
+        with self._connection() as conn:
+            if not conn: return []
+            cursor = conn.cursor(dictionary=True)
+            where, direction, params = "", "ASC", []
+            key, op = (after, ">") if after else (before, "<") if before else (start, ">=")
+            if key:
+                # A row-value comparison lets both MySQL and SQLite seek straight into idx_students_roster.
+                where = f"WHERE (s.name, s.student_id) {op} (%s, %s)"
+                direction = "DESC" if before else "ASC"
+                params = [key[0], key[1]]
+            cursor.execute(self.ROSTER_QUERY.format(where=where, direction=direction), params + [limit])
+            students = cursor.fetchall()
+            cursor.close()
+            return students if not before else students[::-1]
+
+    def count_students(self, before=None):
+        """Number of students, or of those sorting before the (name, student_id) key `before`."""
+        where, params = "", ()
+        if before:
+            where, params = "WHERE (name, student_id) < (%s, %s)", tuple(before)
+        return self._count(f"SELECT COUNT(*) FROM students {where}", params)
 
     def add_student(self, student_id, name, major, year, section, image_path):
         """Adds a new student and their image to the database."""
-        conn = self._connect()
-        if not conn: return False
-        cursor = conn.cursor()
-        try:
-            # Add student details to the 'students' table
-            cursor.execute(
-                "INSERT INTO students (student_id, name, major, year, section) VALUES (%s, %s, %s, %s, %s)",
-                (student_id, name, major, year, section)
-            )
-            # Add the image path to the 'student_images' table
-            cursor.execute(
-                "INSERT INTO student_images (student_id, image_path) VALUES (%s, %s)",
-                (student_id, image_path)
-            )
-            conn.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Database error: {err}")
-            conn.rollback() # Rollback changes if an error occurs
-            return False
-        finally:
-            cursor.close()
-            self._disconnect()
-        
+        with self._connection() as conn:
+            if not conn: return False
+            cursor = conn.cursor()
+            try:
+                # Add student details to the 'students' table
+                cursor.execute(
+                    "INSERT INTO students (student_id, name, major, year, section) VALUES (%s, %s, %s, %s, %s)",
+                    (student_id, name, major, year, section)
+                )
+                # Add the image path to the 'student_images' table
+                cursor.execute(
+                    "INSERT INTO student_images (student_id, image_path) VALUES (%s, %s)",
+                    (student_id, image_path)
+                )
+                conn.commit()
+                self.attendance_state.add(student_id)
+                self.student_cache.invalidate(student_id)
+                return True
+            except self.errors as err:
+                print(f"Database error: {err}")
+                conn.rollback() # Rollback changes if an error occurs
+                return False
+            finally:
+                cursor.close()
+
+    STUDENT_QUERY = """
+        SELECT s.*, (SELECT i.image_path FROM student_images i WHERE i.student_id = s.student_id LIMIT 1) AS image_path
+        FROM students s WHERE s.student_id IN ({})
+    """
+
     def get_student_info(self, student_id):
-        """Fetches all info for a single student."""
-        conn = self._connect()
-        if not conn: return None
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM students WHERE student_id = %s", (student_id,))
-        student_info = cursor.fetchone()
-        cursor.close()
-        self._disconnect()
-        return student_info
+        """Fetches all info for a single student, including their image path, through the cache."""
+        student_info = self.student_cache.get(student_id)
+        if student_info is not None:
+            student_info['daily_status'] = current_status(student_info['last_entry_time'], student_info['daily_status'], date.today())
+            return student_info
+        with self._connection() as conn:
+            if not conn: return None
+            cursor = conn.cursor(dictionary=True)
+            student_info = self._query_students(cursor, [student_id]).get(student_id)
+            cursor.close()
+            return student_info
+
+    def warm_attendance_state(self):
+        """Loads every student's cooldown/presence state into memory. Called once at startup."""
+        with self._connection() as conn:
+            if not conn: return False
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT student_id, last_entry_time, daily_status FROM students")
+            self.attendance_state.load(cursor.fetchall())
+            cursor.close()
+            return True
+
+    def decide_attendance(self, student_id, mode, event_time=None):
+        """
+        Decides an entry/exit event from the in-memory state table without a database round-trip.
+        A rejection as "Not Present" or "Unknown Student" is confirmed against the database first:
+        the student may have entered at another kiosk, or been added by another process.
+        """
+        event_time = event_time or datetime.now()
+        if not self.attendance_state.warmed: self.warm_attendance_state()
+        status = self.attendance_state.decide(student_id, mode, event_time, self.cooldown)
+        if status in ("Not Present", "Unknown Student"):
+            with self._connection() as conn:
+                if not conn: return status
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute("SELECT student_id, last_entry_time, daily_status FROM students WHERE student_id = %s", (student_id,))
+                row = cursor.fetchone()
+                cursor.close()
+            if row and self.attendance_state.refresh(row):
+                status = self.attendance_state.decide(student_id, mode, event_time, self.cooldown)
+        return status
 
     def log_attendance(self, student_id, mode):
         """Logs an entry or exit event and updates the student's status."""
-        conn = self._connect()
-        if not conn: return "DB Error", None
-        cursor = conn.cursor(dictionary=True)
-        
-        current_time = datetime.now()
-        today = current_time.date()
-        
-        # Get the student's last entry time
-        cursor.execute("SELECT last_entry_time, daily_status FROM students WHERE student_id = %s", (student_id,))
-        record = cursor.fetchone()
-        
-        if mode == "entry":
-            # Cooldown: Prevent marking entry again within 30 minutes
-            if record and current_time - record['last_entry_time'] < timedelta(minutes=30):
-                 return "Cooldown", self.get_student_info(student_id)
-            
-            # Update student record for entry
-            cursor.execute("UPDATE students SET total_present = total_present + 1, last_entry_time = %s, daily_status = 'Present' WHERE student_id = %s", (current_time, student_id))
-            # Log the event
-            cursor.execute("INSERT INTO attendance_logs (student_id, date, entry_time, status) VALUES (%s, %s, %s, 'Present')", (student_id, today, current_time))
-
-        elif mode == "exit":
-            if not record or record['daily_status'] != 'Present':
-                return "Not Present", self.get_student_info(student_id)
-            
-            # Log the exit time in the most recent log for that day
-            cursor.execute("UPDATE attendance_logs SET exit_time = %s WHERE student_id = %s AND date = %s ORDER BY id DESC LIMIT 1", (current_time, student_id, today))
-            # Update daily status to reflect exit, but keep total_present the same
-            cursor.execute("UPDATE students SET daily_status = 'Exited' WHERE student_id = %s", (student_id,))
-
-        conn.commit()
-        updated_info = self.get_student_info(student_id)
-        cursor.close()
-        self._disconnect()
-        return "Success", updated_info
-
-    def daily_reset(self):
-        """Resets the daily_status for all students to 'Absent'."""
-        conn = self._connect()
-        if not conn: return 0
-        cursor = conn.cursor()
-        cursor.execute("UPDATE students SET daily_status = 'Absent'")
-        rows_affected = cursor.rowcount
-        conn.commit()
-        cursor.close()
-        self._disconnect()
-        return rows_affected
-    
-    def get_daily_report(self, report_date, search_term=""):
+        try:
+            return self.log_attendance_batch([(student_id, mode, datetime.now())])[0]
+        except (ConnectionError,) + self.errors as err:
+            print(f"Database error during attendance logging: {err}")
+            return "DB Error", None
+
+    def log_attendance_batch(self, events):
         """
-        Fetches a full daily report for a specific date, including absent students.
-        Can be filtered by a search term for student ID or name.
+        Decides and writes (student_id, mode, timestamp) events in order, returning a
+        (status, student_info) pair per event. Raises on database errors.
+        """
+        statuses = [self.decide_attendance(student_id, mode, event_time) for student_id, mode, event_time in events]
+        accepted = [event for event, status in zip(events, statuses) if status == "Success"]
+        with self._connection() as conn:
+            if not conn:
+                self.attendance_state.forget(e[0] for e in accepted)
+                raise ConnectionError("No database connection")
+            try:
+                infos = self.write_attendance_batch(accepted) if accepted else []
+            except self.errors:
+                # The state table ran ahead of the database; reload these students on next use.
+                self.attendance_state.forget(e[0] for e in accepted)
+                raise
+            skipped = {event[0] for event, info in zip(accepted, infos) if info is None}
+            statuses = ["Unknown Student" if status == "Success" and student_id in skipped else status
+                        for status, (student_id, _, _) in zip(statuses, events)]
+            infos = {event[0]: info for event, info in zip(accepted, infos) if info is not None}
+            missing = [student_id for student_id, _, _ in events if student_id not in infos]
+            if missing:
+                cursor = conn.cursor(dictionary=True)
+                infos.update(self._fetch_students(cursor, missing))
+                cursor.close()
+            return [(status, infos.get(student_id)) for status, (student_id, _, _) in zip(statuses, events)]
+
+    def _fetch_students(self, cursor, student_ids, count=True):
+        """Returns {student_id: record}, serving from the cache and querying only the misses."""
+        students, missing, today = {}, [], date.today()
+        for student_id in dict.fromkeys(student_ids):
+            cached = self.student_cache.get(student_id, count)
+            if cached is not None:
+                # A record cached (or written through) for an earlier day has rolled over since.
+                cached['daily_status'] = current_status(cached['last_entry_time'], cached['daily_status'], today)
+                students[student_id] = cached
+            else: missing.append(student_id)
+        if missing: students.update(self._query_students(cursor, missing))
+        return students
+
+    def _query_students(self, cursor, student_ids):
+        cursor.execute(self.STUDENT_QUERY.format(", ".join(["%s"] * len(student_ids))), student_ids)
+        students, today = {}, date.today()
+        for row in cursor.fetchall():
+            row['daily_status'] = current_status(row['last_entry_time'], row['daily_status'], today)
+            self.student_cache.put(row)
+            students[row['student_id']] = row
+        return students
+
+    def write_attendance_batch(self, events):
+        """
+        Writes already-accepted (student_id, mode, timestamp) events in one transaction and returns
+        the updated student_info for each. Writes are grouped into executemany calls; a group is
+        flushed early whenever a student reappears, so each student's events hit the database in
+        order. Events for students that no longer exist (e.g. deleted after the event was decided)
+        are skipped and get None. Raises on database errors so the caller can retry the batch.
         """
-        conn = self._connect()
-        if not conn: return []
-        cursor = conn.cursor(dictionary=True)
+        if not events: return []
+        with self._connection() as conn:
+            if not conn: raise ConnectionError("No database connection")
+            cursor = conn.cursor(dictionary=True)
+            try:
+                all_events = events
+                student_ids = list({student_id for student_id, _, _ in events})
+                cursor.execute("SELECT student_id FROM students WHERE student_id IN ({})".format(
+                    ", ".join(["%s"] * len(student_ids))), student_ids)
+                existing = {row['student_id'] for row in cursor.fetchall()}
+                missing = set(student_ids) - existing
+                if missing:
+                    print(f"Skipping attendance for unknown students: {', '.join(sorted(missing))}")
+                    self.attendance_state.forget(missing)
+                    self.student_cache.invalidate(*missing)
+                    events = [event for event in events if event[0] in existing]
+                statements = {
+                    "entry_student": ("UPDATE students SET total_present = total_present + 1, last_entry_time = %s, daily_status = 'Present' WHERE student_id = %s", []),
+                    "entry_log": ("INSERT INTO attendance_logs (student_id, date, entry_time, status) VALUES (%s, %s, %s, 'Present')", []),
+                    # Log the exit time in the most recent log for that day
+                    "exit_log": (self.backend.update_latest_log, []),
+                    # Update daily status to reflect exit, but keep total_present the same
+                    "exit_student": ("UPDATE students SET daily_status = 'Exited' WHERE student_id = %s", []),
+                    # Rollups: a student's first entry of a day adds a daily_summary row counting on from
+                    # their previous day (and shifts any later days, for back-dated batch imports).
+                    "summary_new_day": ("""INSERT INTO daily_summary (student_id, date, section, entries, first_entry, days_to_date)
+                        SELECT %s, %s, %s, 1, %s, 1 + COALESCE(MAX(days_to_date), 0)
+                        FROM daily_summary WHERE student_id = %s AND date < %s""", []),
+                    "summary_later_days": ("UPDATE daily_summary SET days_to_date = days_to_date + 1 WHERE student_id = %s AND date > %s", []),
+                    "summary_entry": ("UPDATE daily_summary SET entries = entries + 1 WHERE student_id = %s AND date = %s", []),
+                    "summary_exit": ("UPDATE daily_summary SET last_exit = %s WHERE student_id = %s AND date = %s", []),
+                    "section_entry": (self.backend.upsert_section_summary, []),
+                }
+                def flush():
+                    for query, rows in statements.values():
+                        if rows: cursor.executemany(query, rows)
+                        rows.clear()
+
+                attended = self._attended_days(cursor, events)
+                sections = {student_id: info.get('section') or '' for student_id, info in
+                            self._fetch_students(cursor, [e[0] for e in events if e[1] == "entry"], count=False).items()}
+                touched = set()
+                for student_id, mode, event_time in events:
+                    if student_id in touched: flush(); touched.clear()
+                    day = event_time.date()
+                    if mode == "entry":
+                        statements["entry_student"][1].append((event_time, student_id))
+                        statements["entry_log"][1].append((student_id, day, event_time))
+                        section = sections.get(student_id, '')
+                        if (student_id, day) in attended:
+                            statements["summary_entry"][1].append((student_id, day))
+                            statements["section_entry"][1].append((day, section, 0, 1))
+                        else:
+                            attended.add((student_id, day))
+                            statements["summary_new_day"][1].append((student_id, day, section, event_time, student_id, day))
+                            statements["summary_later_days"][1].append((student_id, day))
+                            statements["section_entry"][1].append((day, section, 1, 1))
+                    elif mode == "exit":
+                        statements["exit_log"][1].append((event_time, student_id, day))
+                        statements["exit_student"][1].append((student_id,))
+                        statements["summary_exit"][1].append((event_time, student_id, day))
+                    touched.add(student_id)
+                flush()
+                conn.commit()
+
+                # Write-through: apply the same changes to cached records instead of re-reading them.
+                for student_id, mode, event_time in events:
+                    if mode == "entry":
+                        self.student_cache.update(student_id, increments={'total_present': 1},
+                                                  last_entry_time=event_time, daily_status='Present')
+                    elif mode == "exit":
+                        self.student_cache.update(student_id, daily_status='Exited')
+                infos = self._fetch_students(cursor, [student_id for student_id, _, _ in events])
+                return [infos.get(student_id) for student_id, _, _ in all_events]
+            except self.errors:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
 
+    def _attended_days(self, cursor, events):
+        """The (student_id, date) pairs among the batch's entries that already have a daily_summary row."""
+        ids = list({student_id for student_id, mode, _ in events if mode == "entry"})
+        if not ids: return set()
+        days = list({event_time.date() for _, mode, event_time in events if mode == "entry"})
+        cursor.execute("SELECT student_id, date FROM daily_summary WHERE student_id IN ({}) AND date IN ({})".format(
+            ", ".join(["%s"] * len(ids)), ", ".join(["%s"] * len(days))), ids + days)
+        return {(row['student_id'], row['date']) for row in cursor.fetchall()}
+
+    def rebuild_summaries(self):
+        """Recomputes the daily rollups from attendance_logs, e.g. after logs were imported or edited by hand."""
+        with self._connection() as conn:
+            if not conn: return False
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM section_daily_summary")
+                cursor.execute("DELETE FROM daily_summary")
+                for statement in self.SUMMARY_REBUILD: cursor.execute(statement)
+                conn.commit()
+                return True
+            except self.errors as err:
+                print(f"Database error during summary rebuild: {err}")
+                conn.rollback()
+                return False
+            finally:
+                cursor.close()
+
+    DAILY_REPORT_COLUMNS = ("student_id", "name", "major", "section", "entry_time", "exit_time", "status")
+    LOG_EXPORT_COLUMNS = ("student_id", "name", "section", "date", "entry_time", "exit_time", "status")
+
+    @staticmethod
+    def _report_search(search_term, contains=False, alias=""):
+        """
+        WHERE clause and parameters matching the student ID or name. By default the term must
+        start the value (answered from the indexes); with contains it may appear anywhere, as in
+        the Reports tab's live search.
+        """
+        if not search_term: return "", ()
+        if contains:
+            escaped = search_term.strip().replace('!', '!!').replace('%', '!%').replace('_', '!_')
+            pattern, escape = f"%{escaped}%", " ESCAPE '!'"
+        else:
+            pattern, escape = f"{search_term}%", ""
+        return f"WHERE ({alias}student_id LIKE %s{escape} OR {alias}name LIKE %s{escape})", (pattern, pattern)
+
+    def _daily_report_query(self, report_date, search_term="", contains=False):
         # The COALESCE function is used to show 'Absent' if a log entry doesn't exist for a student on that day.
-        # The LEFT JOIN ensures all students are included, regardless of whether they have an attendance log.
+        # The LEFT JOIN ensures all students are included, regardless of whether they have an attendance log;
+        # each student's log for the day is found through idx_logs_student_date.
         query = """
             SELECT
                 s.student_id,
@@ -203,74 +749,239 @@ class DatabaseManager:
                 students s
             LEFT JOIN
                 attendance_logs l ON s.student_id = l.student_id AND l.date = %s
-            WHERE
-                (s.student_id LIKE %s OR s.name LIKE %s)
+            {where}
             ORDER BY
-                s.name;
+                s.name
         """
-        
-        # The '%' signs are for a "wildcard" search
-        search_pattern = f"%{search_term}%"
-        params = (report_date, search_pattern, search_pattern)
-
-        cursor.execute(query, params)
-        report_data = cursor.fetchall()
-        cursor.close()
-        self._disconnect()
-        return report_data
-    
-    def update_student(self, original_student_id, new_details):
-        """Updates a student's details in the database."""
-        conn = self._connect()
-        if not conn: return False
-        cursor = conn.cursor()
-        try:
-            # Update students table
-            update_student_query = """
-                UPDATE students SET student_id=%s, name=%s, major=%s, year=%s, section=%s 
-                WHERE student_id=%s
+        where, params = self._report_search(search_term, contains, alias="s.")
+        return query.format(where=where), (report_date,) + params
+
+    def get_daily_report(self, report_date, search_term=""):
+        """
+        Fetches a full daily report for a specific date, including absent students.
+        Can be filtered by a search term matching the start of the student ID or name.
+        """
+        with self._connection() as conn:
+            if not conn: return []
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(*self._daily_report_query(report_date, search_term))
+            report_data = cursor.fetchall()
+            cursor.close()
+            return report_data
+
+    def _stream(self, query, params, chunk_size):
+        """
+        Yields the rows of a query in lists of at most chunk_size dicts. The cursor is unbuffered
+        (MySQL's default, and how SQLite always steps), so memory stays at one chunk whatever the
+        result size. The pooled connection is held until the generator is exhausted or closed.
+        """
+        with self._connection() as conn:
+            if not conn: raise ConnectionError("No database connection")
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows: return
+                    yield rows
+            except GeneratorExit:
+                # Stopped early: an unbuffered MySQL result must be read to the end before the
+                # connection can be reused, so drain it a chunk at a time.
+                while cursor.fetchmany(chunk_size): pass
+                raise
+            finally:
+                cursor.close()
+
+    def stream_daily_report(self, report_date, search_term="", chunk_size=5000, contains=False):
+        """get_daily_report, delivered in chunks for exporting. Raises on database errors."""
+        return self._stream(*self._daily_report_query(report_date, search_term, contains), chunk_size)
+
+    def count_daily_report(self, report_date, search_term="", contains=False):
+        where, params = self._report_search(search_term, contains)
+        return self._count(f"SELECT COUNT(*) FROM students {where}", params)
+
+    def _log_range_filter(self, start_date, end_date, search_term=""):
+        """FROM/WHERE clause and parameters shared by the log export and its row count."""
+        clause = "FROM attendance_logs l JOIN students s ON s.student_id = l.student_id WHERE l.date BETWEEN %s AND %s"
+        params = (start_date, end_date)
+        if search_term:
+            clause += " AND (s.student_id LIKE %s OR s.name LIKE %s)"
+            params += (f"{search_term}%",) * 2
+        return clause, params
+
+    def stream_attendance_logs(self, start_date, end_date, search_term="", chunk_size=5000):
+        """Every log row between two dates (inclusive) with the student's name, in chunks. Raises on database errors."""
+        clause, params = self._log_range_filter(start_date, end_date, search_term)
+        query = f"SELECT l.student_id, s.name, s.section, l.date, l.entry_time, l.exit_time, l.status {clause} ORDER BY l.date, l.id"
+        return self._stream(query, params, chunk_size)
+
+    def count_attendance_logs(self, start_date, end_date, search_term=""):
+        clause, params = self._log_range_filter(start_date, end_date, search_term)
+        return self._count(f"SELECT COUNT(*) {clause}", params)
+
+    def _count(self, query, params):
+        with self._connection() as conn:
+            if not conn: return 0
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            count = cursor.fetchone()[0]
+            cursor.close()
+            return count
+
+    def get_range_report(self, start_date, end_date, section="", search_term=""):
+        """
+        Per-student attendance between two dates (inclusive): days present out of the school
+        days in the range (days on which anyone attended) and the percentage. Served from
+        daily_summary in two index lookups per student, however long the range.
+        """
+        with self._connection() as conn:
+            if not conn: return []
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT COUNT(DISTINCT date) AS days FROM section_daily_summary WHERE date BETWEEN %s AND %s",
+                           (start_date, end_date))
+            school_days = cursor.fetchone()['days']
+
+            query = """
+                SELECT
+                    s.student_id,
+                    s.name,
+                    s.major,
+                    s.section,
+                    COALESCE((SELECT d.days_to_date FROM daily_summary d WHERE d.student_id = s.student_id AND d.date <= %s
+                              ORDER BY d.date DESC LIMIT 1), 0)
+                  - COALESCE((SELECT d.days_to_date FROM daily_summary d WHERE d.student_id = s.student_id AND d.date < %s
+                              ORDER BY d.date DESC LIMIT 1), 0) AS days_present
+                FROM students s
+                {where}
+                ORDER BY s.name
             """
-            cursor.execute(update_student_query, (
-                new_details['student_id'], new_details['name'], new_details['major'],
-                new_details['year'], new_details['section'], original_student_id
-            ))
-            
-            # If a new image path is provided, update it
-            if new_details.get('image_path'):
-                update_image_query = "UPDATE student_images SET image_path=%s WHERE student_id=%s"
-                cursor.execute(update_image_query, (new_details['image_path'], new_details['student_id']))
+            conditions, params = [], [end_date, start_date]
+            if section:
+                conditions.append("s.section = %s")
+                params.append(section)
+            if search_term:
+                conditions.append("(s.student_id LIKE %s OR s.name LIKE %s)")
+                params += [f"{search_term}%"] * 2
+            where = "WHERE " + " AND ".join(conditions) if conditions else ""
+            cursor.execute(query.format(where=where), params)
+            report_data = cursor.fetchall()
+            cursor.close()
+            for record in report_data:
+                record['school_days'] = school_days
+                record['percentage'] = round(100.0 * record['days_present'] / school_days, 1) if school_days else 0.0
+            return report_data
 
-            conn.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Database error during update: {err}")
-            conn.rollback()
-            return False
-        finally:
+    def get_section_report(self, start_date, end_date):
+        """
+        Per-section totals between two dates (inclusive) from section_daily_summary: students in
+        the section, student-days present, entries, and the average attendance percentage.
+        """
+        with self._connection() as conn:
+            if not conn: return []
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT COUNT(DISTINCT date) AS days FROM section_daily_summary WHERE date BETWEEN %s AND %s",
+                           (start_date, end_date))
+            school_days = cursor.fetchone()['days']
+            cursor.execute("SELECT COALESCE(section, '') AS section, COUNT(*) AS students FROM students GROUP BY COALESCE(section, '')")
+            enrolled = {row['section']: row['students'] for row in cursor.fetchall()}
+            cursor.execute("""
+                SELECT section, SUM(present) AS present_days, SUM(entries) AS entries
+                FROM section_daily_summary WHERE date BETWEEN %s AND %s
+                GROUP BY section
+            """, (start_date, end_date))
+            totals = {row['section']: row for row in cursor.fetchall()}
             cursor.close()
-            self._disconnect()
+
+            report_data = []
+            for section in sorted(set(enrolled) | set(totals)):
+                present_days = int(totals.get(section, {}).get('present_days') or 0)
+                students = enrolled.get(section, 0)
+                possible = students * school_days
+                report_data.append({'section': section, 'students': students, 'school_days': school_days,
+                                    'present_days': present_days, 'entries': int(totals.get(section, {}).get('entries') or 0),
+                                    'percentage': round(100.0 * present_days / possible, 1) if possible else 0.0})
+            return report_data
+
+    def _remove_section_rollups(self, cursor, student_id):
+        """
+        Takes a student's attended days out of section_daily_summary, dropping section-days left
+        empty. Returns the student's (date, section, entries) daily_summary rows.
+        """
+        cursor.execute("SELECT date, section, entries FROM daily_summary WHERE student_id = %s", (student_id,))
+        days = [tuple(row) for row in cursor.fetchall()]
+        if days:
+            cursor.executemany("UPDATE section_daily_summary SET present = present - 1, entries = entries - %s WHERE date = %s AND section = %s",
+                               [(entries, day, section) for day, section, entries in days])
+            cursor.executemany("DELETE FROM section_daily_summary WHERE date = %s AND section = %s AND present <= 0 AND entries <= 0",
+                               [(day, section) for day, section, _ in days])
+        return days
+
+    def update_student(self, original_student_id, new_details):
+        """Updates a student's details in the database."""
+        with self._connection() as conn:
+            if not conn: return False
+            cursor = conn.cursor()
+            try:
+                # A section change moves the student's past attendance to the new section's rollups.
+                cursor.execute("SELECT section FROM students WHERE student_id = %s", (original_student_id,))
+                row = cursor.fetchone()
+                new_section = new_details.get('section') or ''
+                if row and (row[0] or '') != new_section:
+                    days = self._remove_section_rollups(cursor, original_student_id)
+                    cursor.execute("UPDATE daily_summary SET section = %s WHERE student_id = %s", (new_section, original_student_id))
+                    if days:
+                        cursor.executemany(self.backend.upsert_section_summary,
+                                           [(day, new_section, 1, entries) for day, _, entries in days])
+
+                # Update students table
+                update_student_query = """
+                    UPDATE students SET student_id=%s, name=%s, major=%s, year=%s, section=%s 
+                    WHERE student_id=%s
+                """
+                cursor.execute(update_student_query, (
+                    new_details['student_id'], new_details['name'], new_details['major'],
+                    new_details['year'], new_details['section'], original_student_id
+                ))
+
+                # If a new image path is provided, update it
+                if new_details.get('image_path'):
+                    update_image_query = "UPDATE student_images SET image_path=%s WHERE student_id=%s"
+                    cursor.execute(update_image_query, (new_details['image_path'], new_details['student_id']))
+
+                conn.commit()
+                self.attendance_state.rename(original_student_id, new_details['student_id'])
+                self.student_cache.invalidate(original_student_id, new_details['student_id'])
+                return True
+            except self.errors as err:
+                print(f"Database error during update: {err}")
+                conn.rollback()
+                return False
+            finally:
+                cursor.close()
 
     def delete_student(self, student_id):
         """Deletes a student from the database and their image file."""
-        # First, delete the image file to prevent orphaned files
-        students = self.get_all_students()
-        student_to_delete = next((s for s in students if s['student_id'] == student_id), None)
-        if student_to_delete and student_to_delete.get('image_path'):
-            if os.path.exists(student_to_delete['image_path']):
-                os.remove(student_to_delete['image_path'])
-
-        # Now, delete from the database (ON DELETE CASCADE will handle child tables)
-        conn = self._connect()
-        if not conn: return False
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM students WHERE student_id = %s", (student_id,))
-            conn.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Database error during delete: {err}")
-            conn.rollback()
-            return False
-        finally:
-            cursor.close()
-            self._disconnect()
\ No newline at end of file
+        with self._connection() as conn:
+            # First, delete the image file to prevent orphaned files
+            student_to_delete = self.get_student_info(student_id)
+            if student_to_delete and student_to_delete.get('image_path'):
+                if os.path.exists(student_to_delete['image_path']):
+                    os.remove(student_to_delete['image_path'])
+
+            # Now, delete from the database (ON DELETE CASCADE will handle child tables)
+            if not conn: return False
+            cursor = conn.cursor()
+            try:
+                # daily_summary goes with the cascade, but the section totals have to be reduced by hand.
+                self._remove_section_rollups(cursor, student_id)
+                cursor.execute("DELETE FROM students WHERE student_id = %s", (student_id,))
+                conn.commit()
+                self.attendance_state.forget([student_id])
+                self.student_cache.invalidate(student_id)
+                return True
+            except self.errors as err:
+                print(f"Database error during delete: {err}")
+                conn.rollback()
+                return False
+            finally:
+                cursor.close()
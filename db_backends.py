@@ -0,0 +1,140 @@
+import os
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+import mysql.connector
+
+class MySQLBackend:
+    """Connections to a MySQL server; the [database] section is passed to mysql.connector.connect."""
+    name = 'mysql'
+    errors = (mysql.connector.Error,)
+    # Lost or refused connections, plus lock wait timeout (1205) and deadlock (1213), which
+    # mysql.connector raises as plain DatabaseError.
+    transient_errors = (mysql.connector.OperationalError, mysql.connector.InterfaceError, mysql.connector.PoolError)
+    transient_errnos = (1205, 1213)
+    auto_id = "INT AUTO_INCREMENT PRIMARY KEY"
+    nocase = ""
+    # The exit time goes on the most recent log row of that day.
+    update_latest_log = "UPDATE attendance_logs SET exit_time = %s WHERE student_id = %s AND date = %s ORDER BY id DESC LIMIT 1"
+    upsert_section_summary = """INSERT INTO section_daily_summary (date, section, present, entries) VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE present = present + VALUES(present), entries = entries + VALUES(entries)"""
+
+    def is_transient(self, err):
+        """True for errors worth retrying: the same statement may succeed once the server recovers."""
+        return isinstance(err, self.transient_errors) or getattr(err, 'errno', None) in self.transient_errnos
+
+    def __init__(self, settings):
+        self.settings = {k: v for k, v in settings.items() if k not in ('backend', 'path')}
+        self.key = (self.settings.get('host'), self.settings.get('port'), self.settings.get('database'))
+
+    def connect(self):
+        return mysql.connector.connect(**self.settings)
+
+# SQLite has no native DATE/DATETIME; store ISO text and parse it back by declared column type.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+@lru_cache(maxsize=256)
+def _sqlite_query(query):
+    # Memoised so the same statement text reaches sqlite3 every time and hits its prepared-statement cache.
+    return query.replace('%s', '?')
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3: %s placeholders and dictionary rows."""
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        if dictionary: self._cursor.row_factory = _dict_row
+
+    def execute(self, query, params=()):
+        self._cursor.execute(_sqlite_query(query), params)
+
+    def executemany(self, query, seq_params):
+        self._cursor.executemany(_sqlite_query(query), seq_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """Wraps a sqlite3 connection with the parts of the mysql.connector API DatabaseManager uses."""
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._conn, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def ping(self, reconnect=False, attempts=1):
+        pass # An embedded database cannot drop the connection.
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+class SQLiteBackend:
+    """
+    Embedded database in a single file. WAL mode lets the camera's writer commit while the
+    GUI reads, and each pooled connection keeps its statements prepared.
+    """
+    name = 'sqlite'
+    errors = (sqlite3.Error,)
+    auto_id = "INTEGER PRIMARY KEY AUTOINCREMENT"
+    nocase = " COLLATE NOCASE"
+    update_latest_log = "UPDATE attendance_logs SET exit_time = %s WHERE id = (SELECT MAX(id) FROM attendance_logs WHERE student_id = %s AND date = %s)"
+    upsert_section_summary = """INSERT INTO section_daily_summary (date, section, present, entries) VALUES (%s, %s, %s, %s)
+        ON CONFLICT (date, section) DO UPDATE SET present = present + excluded.present, entries = entries + excluded.entries"""
+
+    def is_transient(self, err):
+        # OperationalError covers "database is locked" and I/O errors; the rest reject the data itself.
+        return isinstance(err, sqlite3.OperationalError)
+
+    def __init__(self, settings):
+        self.path = settings.get('path', 'attendance.db')
+        self.busy_timeout = float(settings.get('busy_timeout', 5.0))
+        self.key = ('sqlite', os.path.abspath(self.path))
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL") # durable across app crashes; WAL is synced at checkpoints
+        conn.execute("PRAGMA foreign_keys = ON")
+        return SQLiteConnection(conn)
+
+BACKENDS = {'mysql': MySQLBackend, 'sqlite': SQLiteBackend}
+
+def create_backend(settings):
+    """Builds the backend named by `backend` in the [database] settings (default mysql)."""
+    name = settings.get('backend', 'mysql')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](settings)
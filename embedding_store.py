@@ -0,0 +1,106 @@
+import os
+import json
+import pickle
+import struct
+import time
+import numpy as np
+
+# File layout:
+#   magic (8 bytes) | header length (uint32, little-endian) | JSON header | padding
+#   | float32 matrix, count x dim, row-major, starting at header['matrix_offset']
+# The header carries the format version, the student IDs in row order and the model
+# parameters the encodings were produced with.
+EMBEDDINGS_FILE = 'Embeddings.bin'
+LEGACY_PICKLE_FILE = 'EncodeFile.p'
+MAGIC = b'FACEEMB\0'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+EMBEDDING_DIM = 128
+# Windows cannot replace a file while any process has it memory-mapped, so there the store is
+# read into memory instead; re-encoding with cameras running then still succeeds.
+MEMORY_MAP = os.name != 'nt'
+
+def save_embeddings(encodings, student_ids, metadata=None, path=EMBEDDINGS_FILE):
+    """Writes encodings and their IDs to the binary store, replacing it atomically."""
+    matrix = np.asarray(encodings, dtype=np.float32).reshape(len(student_ids), -1 if len(student_ids) else EMBEDDING_DIM)
+    matrix = np.ascontiguousarray(matrix)
+    header = {
+        'version': FORMAT_VERSION,
+        'count': int(matrix.shape[0]),
+        'dim': int(matrix.shape[1]),
+        'dtype': 'float32',
+        'model': metadata or {},
+        'student_ids': [str(s) for s in student_ids],
+    }
+    # The matrix offset depends on the header length, which depends on the offset.
+    header['matrix_offset'] = 0
+    while True:
+        header_bytes = json.dumps(header).encode('utf-8')
+        prefix_len = len(MAGIC) + 4 + len(header_bytes)
+        if prefix_len <= header['matrix_offset']: break
+        header['matrix_offset'] = -(-prefix_len // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (header['matrix_offset'] - prefix_len))
+        f.write(matrix.tobytes())
+    for attempt in range(5):
+        try:
+            os.replace(tmp_path, path)
+            break
+        except PermissionError:
+            # Windows: a reader (or a virus scanner) briefly has the old file open.
+            if attempt == 4: raise
+            time.sleep(0.2)
+    return header
+
+def read_header(path=EMBEDDINGS_FILE):
+    """Reads and validates the header of a store file."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not an embeddings file.")
+        (header_len,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported embeddings file version {header.get('version')}.")
+    return header
+
+def load_embeddings(path=EMBEDDINGS_FILE):
+    """
+    Memory-maps the store and returns (matrix, student_ids, header).
+    The matrix is a read-only float32 view of the file, so loading does not copy it. On Windows
+    (MEMORY_MAP is False) it is read into memory and the file is closed again, so that
+    save_embeddings can replace the store while it is in use.
+    """
+    header = read_header(path)
+    if header['count'] == 0:
+        return np.empty((0, header['dim']), np.float32), [], header
+    shape = (header['count'], header['dim'])
+    if MEMORY_MAP:
+        matrix = np.memmap(path, dtype=np.float32, mode='r', offset=header['matrix_offset'], shape=shape)
+    else:
+        matrix = np.fromfile(path, dtype=np.float32, count=shape[0] * shape[1], offset=header['matrix_offset']).reshape(shape)
+        matrix.flags.writeable = False
+    return matrix, header['student_ids'], header
+
+def migrate_pickle(pickle_path=LEGACY_PICKLE_FILE, path=EMBEDDINGS_FILE):
+    """One-shot conversion of a legacy 'EncodeFile.p' into the binary store."""
+    with open(pickle_path, 'rb') as file:
+        encode_list, student_ids = pickle.load(file)
+    header = save_embeddings(encode_list, student_ids, {'migrated_from': os.path.basename(pickle_path)}, path)
+    print(f"Migrated {header['count']} encodings from '{pickle_path}' to '{path}'.")
+    return header
+
+def ensure_store(path=EMBEDDINGS_FILE, pickle_path=LEGACY_PICKLE_FILE):
+    """Returns True if the store exists, migrating a legacy pickle first if that is all there is."""
+    if os.path.exists(path): return True
+    if os.path.exists(pickle_path):
+        migrate_pickle(pickle_path, path)
+        return True
+    return False
+
+if __name__ == "__main__":
+    migrate_pickle()
@@ -0,0 +1,65 @@
+import cv2
+import face_recognition
+
+class FaceDetector:
+    """
+    Two-resolution face pipeline: faces are found on a small copy of the frame (optionally only
+    inside a region of interest), then each face is encoded from a full-resolution crop around
+    its box. Detection cost follows `scale`, while encoding quality follows the camera, so far
+    away faces are not encoded from a handful of pixels and large ones cost no extra detection.
+    Boxes are (top, right, bottom, left) in full-frame pixels.
+    """
+    def __init__(self, scale=0.25, model='hog', upsample=1, num_jitters=1, encoding_model='small',
+                 crop_margin=0.5, roi=None):
+        self.scale = scale
+        self.model = model
+        self.upsample = upsample
+        self.num_jitters = num_jitters
+        self.encoding_model = encoding_model
+        self.crop_margin = crop_margin
+        self.roi = roi # (left, top, right, bottom) as fractions of the frame, or None for all of it
+
+    @classmethod
+    def from_config(cls, config):
+        roi = config.get('pipeline', 'roi', fallback='').strip()
+        return cls(scale=config.getfloat('pipeline', 'detection_scale', fallback=0.25),
+                   model=config.get('pipeline', 'detection_model', fallback='hog'),
+                   upsample=config.getint('pipeline', 'detection_upsample', fallback=1),
+                   num_jitters=config.getint('pipeline', 'num_jitters', fallback=1),
+                   encoding_model=config.get('pipeline', 'encoding_model', fallback='small'),
+                   crop_margin=config.getfloat('pipeline', 'crop_margin', fallback=0.5),
+                   roi=tuple(float(v) for v in roi.split(',')) if roi else None)
+
+    def _roi_origin(self, img):
+        if not self.roi: return 0, 0, img.shape[1], img.shape[0]
+        height, width = img.shape[:2]
+        left, top, right, bottom = self.roi
+        return int(left * width), int(top * height), int(right * width), int(bottom * height)
+
+    def downscale(self, img):
+        """The (BGR) image detection runs on: the region of interest at `scale`."""
+        x0, y0, x1, y1 = self._roi_origin(img)
+        return cv2.resize(img[y0:y1, x0:x1], (0, 0), None, self.scale, self.scale)
+
+    def detect(self, img, img_small):
+        """Face boxes found on img_small (from downscale(img)), mapped back to full-frame pixels."""
+        x0, y0, _, _ = self._roi_origin(img)
+        rgb = cv2.cvtColor(img_small, cv2.COLOR_BGR2RGB)
+        boxes = face_recognition.face_locations(rgb, number_of_times_to_upsample=self.upsample, model=self.model)
+        up = 1.0 / self.scale
+        return [(y0 + int(top * up), x0 + int(right * up), y0 + int(bottom * up), x0 + int(left * up))
+                for top, right, bottom, left in boxes]
+
+    def encode(self, img, boxes):
+        """128-d encodings of the given full-frame boxes, each computed from a crop around the face."""
+        height, width = img.shape[:2]
+        encodings = []
+        for top, right, bottom, left in boxes:
+            # The margin gives the landmark model the chin, brows and ears around the box.
+            mx, my = int((right - left) * self.crop_margin), int((bottom - top) * self.crop_margin)
+            cx0, cy0 = max(0, left - mx), max(0, top - my)
+            cx1, cy1 = min(width, right + mx), min(height, bottom + my)
+            crop = cv2.cvtColor(img[cy0:cy1, cx0:cx1], cv2.COLOR_BGR2RGB)
+            box = (top - cy0, right - cx0, bottom - cy0, left - cx0)
+            encodings += face_recognition.face_encodings(crop, [box], num_jitters=self.num_jitters, model=self.encoding_model)
+        return encodings
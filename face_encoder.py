@@ -1,44 +1,149 @@
 import os
 import cv2
 import face_recognition
+import hashlib
 import pickle
 import shutil
+from embedding_store import EMBEDDINGS_FILE, save_embeddings
+from face_matcher import build_ivf_index
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def generate_encodings(images_folder='Images', failed_folder='FailedImages'):
+CACHE_FILE = 'EncodeCache.p'
+CACHE_VERSION = 1
+
+def _file_digest(path):
+    """Returns the SHA-1 of a file's contents."""
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _load_cache(cache_file, params):
+    """Loads the encoding cache, discarding it if it was built with other model parameters."""
+    try:
+        with open(cache_file, 'rb') as f:
+            cache = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        cache = None
+    if not cache or cache.get('version') != CACHE_VERSION or cache.get('params') != params:
+        return {'version': CACHE_VERSION, 'params': params, 'files': {}, 'encodings': {}}
+    return cache
+
+def _init_worker():
+    # Each worker process gets one core; let the pool, not OpenCV, provide the parallelism.
+    cv2.setNumThreads(1)
+
+def _encode_image(path, num_jitters, model):
+    """Decodes and encodes one image. Runs inside a pool worker, so it must stay top-level."""
+    img = cv2.imread(path)
+    if img is None: return None, False
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    encodes = face_recognition.face_encodings(img_rgb, num_jitters=num_jitters, model=model)
+    return (encodes[0] if encodes else None), True
+
+def _save_cache(cache, cache_file):
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(cache, f)
+    os.replace(tmp_file, cache_file)
+
+def generate_encodings(images_folder='Images', failed_folder='FailedImages',
+                       num_jitters=1, model='small', cache_file=CACHE_FILE,
+                       workers=None, progress=None, cancel_event=None):
+    """
+    Encodes every image in images_folder and writes the embeddings store.
+    Cache misses are spread over a process pool of `workers` processes (default: all cores,
+    1 encodes in-process). `progress(done, total, filename)` is called as each image finishes,
+    and setting `cancel_event` stops the run without touching the store.
+    """
     os.makedirs(failed_folder, exist_ok=True)
     student_ids, encode_list = [], []
-    
+
     print("Encoding started...")
     image_files = [f for f in os.listdir(images_folder) if f.endswith(('.png', '.jpg', '.jpeg'))]
-    
+
     if not image_files:
         print("No images found to encode.")
         return False
 
-    for i, filename in enumerate(image_files):
-        student_id = os.path.splitext(filename)[0]
+    # Encodings are cached by file content so only new or changed images reach dlib.
+    # 'files' remembers (size, mtime) -> digest so unchanged files are not even re-read.
+    cache = _load_cache(cache_file, {'num_jitters': num_jitters, 'model': model})
+    seen_files, seen_digests = {}, {}
+    results, pending = {}, []
+    total = len(image_files)
+
+    for filename in image_files:
         path = os.path.join(images_folder, filename)
-        print(f"--> Processing {i+1}/{len(image_files)}: {filename}")
-        
-        img = cv2.imread(path)
-        if img is None: continue
-        
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        encodes = face_recognition.face_encodings(img_rgb)
-        
-        if encodes:
-            encode_list.append(encodes[0])
-            student_ids.append(student_id)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached_file = cache['files'].get(filename)
+        digest = cached_file[1] if cached_file and cached_file[0] == signature else _file_digest(path)
+        seen_files[filename] = (signature, digest)
+        if digest in cache['encodings']:
+            results[filename] = cache['encodings'][digest]
         else:
+            pending.append(filename)
+
+    print(f"{len(results)}/{total} images reused from cache, {len(pending)} to encode.")
+    done = len(results)
+    if progress: progress(done, total, None)
+
+    def handle_result(filename, encoding, readable):
+        nonlocal done
+        done += 1
+        print(f"--> Processed {done}/{total}: {filename}")
+        if encoding is not None:
+            results[filename] = encoding
+            seen_digests[seen_files[filename][1]] = encoding
+        elif readable:
             print(f"  [FAILED] No face in {filename}. Moving to '{failed_folder}'.")
-            shutil.move(path, os.path.join(failed_folder, filename))
+            shutil.move(os.path.join(images_folder, filename), os.path.join(failed_folder, filename))
+        if progress: progress(done, total, filename)
+
+    cancelled = False
+    workers = workers or os.cpu_count() or 1
+    if pending and workers == 1:
+        for filename in pending:
+            if cancel_event and cancel_event.is_set():
+                cancelled = True
+                break
+            handle_result(filename, *_encode_image(os.path.join(images_folder, filename), num_jitters, model))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker) as pool:
+            futures = {pool.submit(_encode_image, os.path.join(images_folder, f), num_jitters, model): f for f in pending}
+            for future in as_completed(futures):
+                if cancel_event and cancel_event.is_set():
+                    cancelled = True
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    break
+                handle_result(futures[future], *future.result())
+
+    # Entries for images that were deleted or replaced are dropped here. Work finished
+    # before a cancel is kept, so the next run picks up where this one stopped.
+    for filename, (signature, digest) in seen_files.items():
+        if filename in results: seen_digests[digest] = results[filename]
+    cache['files'] = {f: v for f, v in seen_files.items() if v[1] in seen_digests}
+    cache['encodings'] = seen_digests
+    _save_cache(cache, cache_file)
+
+    if cancelled:
+        print("Encoding cancelled.")
+        return False
+
+    for filename in image_files:
+        if filename in results:
+            encode_list.append(results[filename])
+            student_ids.append(os.path.splitext(filename)[0])
 
     if not encode_list:
         print("No faces could be encoded.")
         return False
 
-    with open('EncodeFile.p', 'wb') as file:
-        pickle.dump([encode_list, student_ids], file)
-    
-    print("\nEncoding complete. 'EncodeFile.p' saved.")
-    return True
\ No newline at end of file
+    save_embeddings(encode_list, student_ids, {'num_jitters': num_jitters, 'model': model})
+    # Kept alongside the store so the 'ivf' matcher backend starts without re-clustering.
+    build_ivf_index(encode_list)
+
+    print(f"\nEncoding complete. '{EMBEDDINGS_FILE}' saved.")
+    return True
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import zipfile
+import numpy as np
+
+MATCH_THRESHOLD = 0.50
+# A face whose best and second-best gallery distances are closer than this is ambiguous
+# and is rejected rather than risk marking the wrong student.
+AMBIGUITY_MARGIN = 0.03
+IVF_INDEX_FILE = 'Embeddings.ivf.npz'
+
+def pairwise_distances(queries, gallery, gallery_sq_norms=None):
+    """Euclidean distances between every query row and every gallery row, shape (queries, gallery)."""
+    queries = np.asarray(queries, dtype=np.float32).reshape(-1, gallery.shape[1])
+    if gallery_sq_norms is None:
+        gallery_sq_norms = np.einsum('ij,ij->i', gallery, gallery)
+    # |q - g|^2 = |q|^2 + |g|^2 - 2 q.g, so the whole frame is a single matrix product.
+    sq_dists = np.einsum('ij,ij->i', queries, queries)[:, None] + gallery_sq_norms[None, :] - 2.0 * (queries @ gallery.T)
+    return np.sqrt(np.maximum(sq_dists, 0.0))
+
+def _top_k(face_dis, k):
+    """Returns (distances, columns) of the k smallest entries of each row, closest first."""
+    k = min(k, face_dis.shape[1])
+    columns = np.argpartition(face_dis, k - 1, axis=1)[:, :k] if k < face_dis.shape[1] else np.tile(np.arange(k), (len(face_dis), 1))
+    distances = np.take_along_axis(face_dis, columns, axis=1)
+    order = np.argsort(distances, axis=1)
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(columns, order, axis=1)
+
+def gallery_fingerprint(gallery):
+    """Short content hash used to tie a saved index to the gallery it was built from."""
+    return hashlib.sha1(np.ascontiguousarray(gallery).tobytes()).hexdigest()
+
+class Matcher:
+    """
+    Base class for matcher backends. Subclasses implement search(); match() turns the
+    top-2 candidates of every face into accepted matches.
+    """
+    def __init__(self, gallery, student_ids):
+        self.gallery = gallery
+        self.student_ids = student_ids
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def search(self, encodings, k=1):
+        """Returns (distances, gallery_indices) of the k nearest gallery rows per face, each (faces, k)."""
+        raise NotImplementedError
+
+    def match(self, encodings, threshold=MATCH_THRESHOLD, margin=AMBIGUITY_MARGIN):
+        """
+        Matches every face encoding in a frame in one pass.
+        Returns (face_index, student_id, distance) tuples, closest first. Faces that are too far
+        from the gallery or ambiguous between two students are dropped, and a student matched
+        by several faces is kept only for the closest one.
+        """
+        if len(self) == 0 or len(encodings) == 0: return []
+        top_dis, top_index = self.search(encodings, k=2)
+        best_index, best_dis = top_index[:, 0], top_dis[:, 0]
+        accepted = (best_index >= 0) & (best_dis < threshold)
+        if top_dis.shape[1] > 1:
+            accepted &= (top_dis[:, 1] - best_dis) >= margin
+
+        matches, claimed = [], set()
+        for face_index in np.argsort(best_dis):
+            if not accepted[face_index] or best_index[face_index] in claimed: continue
+            claimed.add(best_index[face_index])
+            matches.append((int(face_index), self.student_ids[best_index[face_index]], float(best_dis[face_index])))
+        return matches
+
+class BruteForceMatcher(Matcher):
+    """Exact matcher that compares every face in a frame against the whole gallery at once."""
+    def __init__(self, gallery, student_ids):
+        super().__init__(gallery, student_ids)
+        self.gallery_sq_norms = np.einsum('ij,ij->i', gallery, gallery) if len(gallery) else np.empty(0, np.float32)
+
+    def distances(self, encodings):
+        return pairwise_distances(encodings, self.gallery, self.gallery_sq_norms)
+
+    def search(self, encodings, k=1):
+        return _top_k(self.distances(encodings), k)
+
+def kmeans(data, n_clusters, iterations=15, sample_size=50000, seed=0):
+    """Plain Lloyd's k-means in NumPy. Trains on a random sample and returns the centroids."""
+    rng = np.random.default_rng(seed)
+    if len(data) > sample_size:
+        data = data[rng.choice(len(data), sample_size, replace=False)]
+    data = np.asarray(data, dtype=np.float32)
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmin(pairwise_distances(data, centroids), axis=1)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Re-seed empty clusters from random points so every list stays useful.
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+    return centroids
+
+def build_ivf_index(gallery, n_lists=None, path=IVF_INDEX_FILE):
+    """
+    Partitions the gallery into n_lists k-means cells (default ~sqrt(N)) and saves the
+    inverted lists as a CSR layout: rows sorted by cell, plus per-cell offsets.
+    """
+    gallery = np.asarray(gallery, dtype=np.float32)
+    n_lists = n_lists or max(1, int(np.sqrt(len(gallery))))
+    n_lists = min(n_lists, len(gallery))
+    centroids = kmeans(gallery, n_lists)
+    assignment = np.argmin(pairwise_distances(gallery, centroids), axis=1)
+    order = np.argsort(assignment, kind='stable')
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=n_lists))))
+    # Written aside and swapped in, so an interrupted build never leaves a truncated index behind.
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, centroids=centroids, order=order, offsets=offsets, fingerprint=gallery_fingerprint(gallery))
+    os.replace(tmp_path, path)
+    print(f"IVF index built: {len(gallery)} encodings in {n_lists} lists.")
+    return centroids, order, offsets
+
+class IVFMatcher(Matcher):
+    """
+    Approximate matcher over an inverted-file index. Each face is compared only against the
+    gallery rows in its `nprobe` nearest k-means cells, so cost grows with ~sqrt(N), not N.
+    """
+    def __init__(self, gallery, student_ids, centroids, order, offsets, nprobe=8):
+        super().__init__(gallery, student_ids)
+        self.centroids = centroids
+        self.nprobe = min(nprobe, len(centroids))
+        # Rows are stored list-contiguous so probing a cell reads one slice.
+        self.order = order
+        self.offsets = offsets
+        self.list_gallery = np.ascontiguousarray(np.asarray(gallery, dtype=np.float32)[order])
+        self.list_sq_norms = np.einsum('ij,ij->i', self.list_gallery, self.list_gallery)
+        self.list_rows = [np.arange(offsets[c], offsets[c + 1]) for c in range(len(centroids))]
+        self.list_cell = np.repeat(np.arange(len(centroids)), np.diff(offsets))
+
+    @classmethod
+    def load(cls, gallery, student_ids, path=IVF_INDEX_FILE, nprobe=8):
+        """Loads a saved index, rebuilding it if it is missing, unreadable or was built for another gallery."""
+        try:
+            with np.load(path) as index:
+                if str(index['fingerprint']) == gallery_fingerprint(gallery):
+                    return cls(gallery, student_ids, index['centroids'], index['order'], index['offsets'], nprobe)
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            pass
+        return cls(gallery, student_ids, *build_ivf_index(gallery, path=path), nprobe=nprobe)
+
+    def search(self, encodings, k=1):
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, self.gallery.shape[1])
+        probes = _top_k(pairwise_distances(encodings, self.centroids), self.nprobe)[1]
+        # All faces in the frame share one candidate set (the union of their probed cells), so
+        # the frame still costs a single matrix product; rows outside a face's own cells are masked.
+        cells = np.unique(probes)
+        rows = np.concatenate([self.list_rows[c] for c in cells])
+        if len(rows) == 0:
+            return np.full((len(encodings), k), np.inf), np.full((len(encodings), k), -1)
+        face_dis = pairwise_distances(encodings, self.list_gallery[rows], self.list_sq_norms[rows])
+        probed = np.zeros((len(encodings), len(self.centroids)), dtype=bool)
+        np.put_along_axis(probed, probes, True, axis=1)
+        face_dis[~probed[:, self.list_cell[rows]]] = np.inf
+        top_dis, columns = _top_k(face_dis, k)
+        top_index = np.where(np.isfinite(top_dis), self.order[rows[columns]], -1)
+        if top_dis.shape[1] < k:
+            pad = k - top_dis.shape[1]
+            top_dis = np.pad(top_dis, ((0, 0), (0, pad)), constant_values=np.inf)
+            top_index = np.pad(top_index, ((0, 0), (0, pad)), constant_values=-1)
+        return top_dis, top_index
+
+def create_matcher(gallery, student_ids, backend='brute', nprobe=8, index_path=IVF_INDEX_FILE):
+    """Builds the configured matcher backend: 'brute' (exact, default) or 'ivf' (approximate)."""
+    if backend == 'ivf' and len(gallery) > 0:
+        return IVFMatcher.load(gallery, student_ids, index_path, nprobe)
+    if backend not in ('brute', 'ivf'):
+        print(f"Unknown matcher backend '{backend}', using brute force.")
+    return BruteForceMatcher(gallery, student_ids)
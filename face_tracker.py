@@ -0,0 +1,80 @@
+import itertools
+import time
+
+def box_iou(a, b):
+    """Intersection-over-union of two (top, right, bottom, left) boxes as returned by face_locations."""
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    if inter == 0: return 0.0
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    return inter / float(area_a + area_b - inter)
+
+class Track:
+    """One face followed across frames, with the identity last assigned to it."""
+    _ids = itertools.count(1)
+
+    def __init__(self, box, now):
+        self.track_id = next(self._ids)
+        self.box = box
+        self.last_seen = now
+        self.student_id = None
+        self.distance = None
+        self.identified_at = None
+        self.last_attempt = None
+
+    def identify(self, student_id, distance, now):
+        self.student_id, self.distance = student_id, distance
+        self.identified_at = self.last_attempt = now
+
+    def mark_unmatched(self, now):
+        self.student_id = self.distance = self.identified_at = None
+        self.last_attempt = now
+
+class FaceTracker:
+    """
+    Associates detections across frames by greedy IoU matching so a face only has to be
+    encoded when its track is new, its identity has expired, or a failed match is due a retry.
+    """
+    def __init__(self, iou_threshold=0.3, identity_ttl=5.0, retry_interval=0.5, max_age=2.0):
+        self.iou_threshold = iou_threshold
+        self.identity_ttl = identity_ttl
+        self.retry_interval = retry_interval
+        self.max_age = max_age
+        self.tracks = []
+
+    def update(self, face_locations, now=None):
+        """Returns the track for each location, in the same order, creating tracks for new faces."""
+        now = time.monotonic() if now is None else now
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.max_age]
+
+        pairs = sorted(((box_iou(t.box, box), ti, bi) for ti, t in enumerate(self.tracks)
+                        for bi, box in enumerate(face_locations)), reverse=True)
+        assigned, used_tracks = [None] * len(face_locations), set()
+        for iou, ti, bi in pairs:
+            if iou < self.iou_threshold: break
+            if ti in used_tracks or assigned[bi] is not None: continue
+            used_tracks.add(ti)
+            assigned[bi] = self.tracks[ti]
+
+        for bi, box in enumerate(face_locations):
+            if assigned[bi] is None:
+                assigned[bi] = Track(box, now)
+                self.tracks.append(assigned[bi])
+            assigned[bi].box, assigned[bi].last_seen = box, now
+        return assigned
+
+    def needs_encoding(self, track, now=None):
+        now = time.monotonic() if now is None else now
+        if track.student_id is not None:
+            return now - track.identified_at > self.identity_ttl
+        return track.last_attempt is None or now - track.last_attempt > self.retry_interval
+
+    def assign(self, tracks, matches, now=None):
+        """Records match results, (face_index, student_id, distance) tuples, on the tracks that were encoded."""
+        now = time.monotonic() if now is None else now
+        matched = {face_index: (student_id, distance) for face_index, student_id, distance in matches}
+        for face_index, track in enumerate(tracks):
+            if face_index in matched: track.identify(*matched[face_index], now)
+            else: track.mark_unmatched(now)
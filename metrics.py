@@ -0,0 +1,146 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Bucket upper bounds grow by 15% from 10us to ~100s, so a percentile read from the
+# histogram is within 15% of the true value while recording stays O(log buckets).
+BUCKET_BOUNDS = [1e-5 * 1.15 ** i for i in range(116)]
+_DISABLED = nullcontext()
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; memory does not grow with the number of samples."""
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, in seconds."""
+        if not self.count: return 0.0
+        rank, seen = p / 100.0 * self.count, 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank: return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def summary(self):
+        return {'count': self.count, 'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+                'p50_ms': self.percentile(50) * 1000, 'p95_ms': self.percentile(95) * 1000,
+                'p99_ms': self.percentile(99) * 1000, 'max_ms': self.max * 1000}
+
+class Metrics:
+    """
+    Per-stage latency histograms and event counters for the recognition pipeline.
+    When disabled, timer() hands back a shared no-op context and count() returns at once,
+    so instrumented code pays about one attribute check per call.
+    """
+    def __init__(self, enabled=False, overlay=False, export_file=None, export_interval=10.0):
+        self.enabled = enabled
+        self.overlay = enabled and overlay
+        self.export_file = export_file
+        self.export_interval = export_interval
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self._cpu_mark = (self.started, time.process_time())
+        self._overlay_lines, self._overlay_at = [], 0.0
+        self._stop = threading.Event()
+        self._exporter = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(enabled=config.getboolean('metrics', 'enabled', fallback=False),
+                   overlay=config.getboolean('metrics', 'overlay', fallback=False),
+                   export_file=config.get('metrics', 'export_file', fallback='metrics.json') or None,
+                   export_interval=config.getfloat('metrics', 'export_interval', fallback=10.0))
+
+    def timer(self, stage):
+        """Context manager that records the time spent in its block under `stage`."""
+        if not self.enabled: return _DISABLED
+        return self._timed(stage)
+
+    @contextmanager
+    def _timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        if not self.enabled: return
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None: histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        with self.lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def _cpu_percent(self):
+        # Process CPU time over wall time since the previous snapshot; 100 is one full core.
+        wall, cpu = time.monotonic(), time.process_time()
+        (last_wall, last_cpu), self._cpu_mark = self._cpu_mark, (wall, cpu)
+        return round((cpu - last_cpu) / (wall - last_wall) * 100, 1) if wall > last_wall else 0.0
+
+    def snapshot(self):
+        with self.lock:
+            return {'time': datetime.now().isoformat(timespec='seconds'),
+                    'uptime_s': round(time.monotonic() - self.started, 1),
+                    'cpu_percent': self._cpu_percent(),
+                    'stages': {stage: histogram.summary() for stage, histogram in self.stages.items()},
+                    'counters': dict(self.counters)}
+
+    def overlay_lines(self, refresh=1.0):
+        """Short per-stage text for the on-screen overlay, recomputed at most every `refresh` seconds."""
+        now = time.monotonic()
+        if now - self._overlay_at >= refresh:
+            snapshot = self.snapshot()
+            lines = [f"{stage} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f}ms"
+                     for stage, s in snapshot['stages'].items()]
+            lines += [f"{name} {value}" for name, value in snapshot['counters'].items()]
+            lines.insert(0, f"cpu {snapshot['cpu_percent']:.0f}%")
+            self._overlay_lines, self._overlay_at = lines, now
+        return self._overlay_lines
+
+    def export(self):
+        """Writes the current snapshot to export_file atomically."""
+        if not self.enabled or not self.export_file: return
+        tmp_file = self.export_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_file, self.export_file)
+
+    def start(self):
+        """Starts exporting every export_interval seconds in the background."""
+        if not self.enabled or not self.export_file or self._exporter: return
+        self._stop.clear()
+        self._exporter = threading.Thread(target=self._export_loop, daemon=True)
+        self._exporter.start()
+
+    def stop(self):
+        if self._exporter:
+            self._stop.set()
+            self._exporter.join(timeout=2.0)
+            self._exporter = None
+        self.export()
+
+    def _export_loop(self):
+        while not self._stop.wait(self.export_interval):
+            try:
+                self.export()
+            except OSError as err:
+                print(f"Could not write metrics to {self.export_file}: {err}")
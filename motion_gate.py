@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+class MotionGate:
+    """
+    Decides per frame whether face detection is worth running, by differencing the already
+    downscaled frame against the last one it looked at. While the scene is still (idle) frames
+    are only examined at `idle_fps`; motion, or a face found by detection, keeps the gate awake
+    for `hold` seconds. Times are in the caller's frame clock (monotonic or video seconds).
+    """
+    def __init__(self, pixel_threshold=25, min_area=0.005, idle_fps=2.0, hold=2.0):
+        self.pixel_threshold = pixel_threshold
+        self.min_area = min_area
+        self.idle_interval = 1.0 / idle_fps if idle_fps > 0 else 0.0
+        self.hold = hold
+        self.previous = None
+        self.last_check = None
+        self.awake_until = None
+
+    def is_awake(self, now):
+        return self.awake_until is not None and now < self.awake_until
+
+    def due(self, now):
+        """Whether a frame at `now` should be examined at all; while idle only every idle_interval."""
+        return self.is_awake(now) or self.last_check is None or now - self.last_check >= self.idle_interval
+
+    def check(self, img_small, now):
+        """
+        Returns (run_detection, idle_gap) for a frame that is due. idle_gap is set on the frame that
+        wakes the gate: the time since the previous idle check, i.e. how long the change may have
+        gone unnoticed.
+        """
+        awake = self.is_awake(now)
+        gray = cv2.cvtColor(img_small, cv2.COLOR_BGR2GRAY)
+        previous, self.previous = self.previous, gray
+        last_check, self.last_check = self.last_check, now
+        if previous is None or previous.shape != gray.shape:
+            return True, None # nothing to compare against yet: look once
+        changed = np.count_nonzero(cv2.absdiff(gray, previous) > self.pixel_threshold)
+        if changed >= self.min_area * gray.size:
+            self.awake_until = now + self.hold
+            return True, (now - last_check if not awake else None)
+        return awake, None
+
+    def saw_faces(self, now):
+        # Someone standing still in front of the camera still needs to be recognised.
+        self.awake_until = now + self.hold
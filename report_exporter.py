@@ -0,0 +1,53 @@
+import csv
+import os
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet export is optional: pip install pyarrow
+    pa = pq = None
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+def _arrow_schema(columns):
+    types = {'date': pa.date32(), 'entry_time': pa.timestamp('us'), 'exit_time': pa.timestamp('us'), 'year': pa.int32()}
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+def export_chunks(chunks, columns, path, fmt=None, total=None, progress=None, cancel_event=None):
+    """
+    Writes a generator of row chunks (lists of dicts, e.g. DatabaseManager.stream_daily_report) to `path`
+    as CSV or Parquet (default: from the file extension), one chunk at a time, so memory does
+    not grow with the export. `progress(done, total)` is called after each chunk. Output goes
+    to a .part file that is renamed at the end, so a failed or cancelled export leaves nothing
+    behind. Returns the number of rows written, or None if cancelled.
+    """
+    fmt = fmt or ('parquet' if path.lower().endswith('.parquet') else 'csv')
+    if fmt not in EXPORT_FORMATS: raise ValueError(f"Unknown export format '{fmt}'")
+    if fmt == 'parquet' and pq is None: raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+
+    tmp_path, done = path + '.part', 0
+    try:
+        with open(tmp_path, 'w' if fmt == 'csv' else 'wb', newline='' if fmt == 'csv' else None,
+                  encoding='utf-8' if fmt == 'csv' else None) as f:
+            if fmt == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(columns)
+            else:
+                schema = _arrow_schema(columns)
+                writer = pq.ParquetWriter(f, schema)
+            try:
+                for rows in chunks:
+                    if cancel_event and cancel_event.is_set(): return None
+                    if fmt == 'csv':
+                        writer.writerows([row[column] for column in columns] for row in rows)
+                    else:
+                        # One row group per chunk.
+                        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                    done += len(rows)
+                    if progress: progress(done, total)
+            finally:
+                chunks.close() # releases the database connection if the export stopped early
+                if fmt == 'parquet': writer.close()
+        os.replace(tmp_path, path)
+        return done
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
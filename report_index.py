@@ -0,0 +1,49 @@
+import bisect
+import re
+from datetime import datetime
+
+class ReportIndex:
+    """
+    In-memory index over one day's report rows for live search and sorting in the Reports tab.
+    IDs and names are kept lower-cased in one newline-joined string, so a substring lookup is a
+    single regex scan in C; a term that extends the previous one only re-checks the previous hits.
+    """
+    def __init__(self, records):
+        self.records = records
+        lines = [f"{r['student_id']}\t{r['name']}".lower() for r in records]
+        self._text = "\n".join(lines)
+        self._starts, offset = [], 0
+        for line in lines:
+            self._starts.append(offset)
+            offset += len(line) + 1
+        self._last_term, self._last_hits = "", list(range(len(records)))
+
+    def search(self, term):
+        """Indices of the records whose ID or name contains `term` (case-insensitive), in record order."""
+        term = term.strip().lower()
+        if not term: return list(range(len(self.records)))
+        if self._last_term and term.startswith(self._last_term):
+            # Typing narrows the previous result; no need to rescan the whole day.
+            hits = [i for i in self._last_hits if term in self._text[self._starts[i]:self._line_end(i)]]
+        else:
+            hits = sorted({bisect.bisect_right(self._starts, m.start()) - 1
+                           for m in re.finditer(re.escape(term), self._text)})
+        self._last_term, self._last_hits = term, hits
+        return hits
+
+    def _line_end(self, i):
+        return self._starts[i + 1] - 1 if i + 1 < len(self._starts) else len(self._text)
+
+    def sort(self, indices, column, reverse=False):
+        """Sorts record indices by a report column; empty values (e.g. no exit time) always go last."""
+        def key(i):
+            value = self.records[i][column]
+            if isinstance(value, (int, float, datetime)): return value
+            return int(value) if str(value).isdigit() else str(value).lower()
+        present = [i for i in indices if self.records[i].get(column) is not None]
+        missing = [i for i in indices if self.records[i].get(column) is None]
+        try:
+            present.sort(key=key, reverse=reverse)
+        except TypeError: # a mix of numeric and text IDs
+            present.sort(key=lambda i: str(self.records[i][column]).lower(), reverse=reverse)
+        return present + missing